@@ -0,0 +1,185 @@
+"""
+Cold-start benchmark for the cloud functions
+
+Every sample runs in a fresh interpreter, the way a new serverless instance
+does: it times importing the function's main.py, the first request (which
+pays for any deferred SciPy imports) and a second, warm request, and records
+which SciPy submodules were loaded at each point.
+
+Usage:
+    python cloud-functions/benchmarks/cold_start.py
+    python cloud-functions/benchmarks/cold_start.py --repeats 9 --json
+    python cloud-functions/benchmarks/cold_start.py --max-import-ms 400 --max-first-request-ms 1500
+
+Exits with status 1 when a limit is exceeded or when scipy.stats is loaded
+at import time (it must only be imported by the operations that need it).
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+FUNCTIONS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# SciPy submodules whose import cost matters for cold starts
+TRACKED_MODULES = ("scipy", "scipy.special", "scipy.stats")
+
+_X = [4.1, 5.3, 3.8, 6.0, 5.5, 4.9, 5.1, 4.4, 6.2, 5.0, 4.7, 5.8]
+_Y = [3.9, 4.2, 3.1, 5.2, 4.8, 4.0, 4.6, 3.5, 5.1, 4.3, 4.1, 4.9]
+
+# name -> (function directory, entry point, request body)
+CASES = {
+    "rm_anova_power:observed": ("rm_anova_power", "rm_anova_power", {
+        "mode": "observed", "f_statistic": 4.2, "df_between": 2, "df_error": 38, "n": 20, "k": 3,
+    }),
+    "rm_anova_power:required": ("rm_anova_power", "rm_anova_power", {
+        "mode": "required", "effect_size_f": 0.25, "k": 3, "target_power": 0.80,
+    }),
+    "dependent_module:power": ("dependent_module", "dependent_module", {
+        "operation": "power", "mode": "observed", "f_statistic": 4.2, "df_between": 2, "df_error": 38, "n": 20, "k": 3,
+    }),
+    "dependent_module:permutation": ("dependent_module", "dependent_module", {
+        "operation": "permutation", "group_a": _X, "group_b": _Y, "permutations": 2000, "seed": 42,
+    }),
+    "dependent_module:bootstrap": ("dependent_module", "dependent_module", {
+        "operation": "bootstrap", "group_a": _X, "group_b": _Y, "n_resamples": 2000, "seed": 42,
+    }),
+    "permutation_engine:compare": ("permutation_engine", "permutation_engine", {
+        "group_a": _X, "group_b": _Y, "permutations": 2000, "seed": 42,
+    }),
+}
+
+
+class _Request:
+    """Minimal stand-in for the Flask request the functions receive"""
+
+    method = "POST"
+
+    def __init__(self, body: Dict[str, Any]):
+        self._body = body
+        self.headers: Dict[str, str] = {"Content-Type": "application/json"}
+        self.args: Dict[str, str] = {}
+        self.data = json.dumps(body).encode()
+
+    def get_json(self, silent: bool = False, force: bool = False):
+        return self._body
+
+    def get_data(self, *args, **kwargs):
+        return self.data
+
+
+def _loaded_modules() -> List[str]:
+    return [name for name in TRACKED_MODULES if name in sys.modules]
+
+
+def _run_case(name: str) -> Dict[str, Any]:
+    """Measure one case in this (fresh) interpreter"""
+    directory, entry, body = CASES[name]
+    path = os.path.join(FUNCTIONS_DIR, directory, "main.py")
+
+    start = time.perf_counter()
+    spec = importlib.util.spec_from_file_location(f"{directory}_main", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    imported = time.perf_counter()
+    at_import = _loaded_modules()
+
+    handler = getattr(module, entry)
+    first = handler(_Request(body))
+    first_done = time.perf_counter()
+    handler(_Request(body))
+    warm_done = time.perf_counter()
+
+    status = first[1] if isinstance(first, tuple) else 200
+    return {
+        "import_ms": (imported - start) * 1000,
+        "first_request_ms": (first_done - imported) * 1000,
+        "warm_request_ms": (warm_done - first_done) * 1000,
+        "status": status,
+        "modules_at_import": at_import,
+        "modules_after_request": _loaded_modules(),
+    }
+
+
+def _sample(name: str) -> Dict[str, Any]:
+    """Run one case in a new interpreter and return its measurements"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", name],
+        capture_output=True, text=True, check=False,
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{proc.stderr.strip()}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process_ms"] = elapsed
+    return result
+
+
+def _summarize(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {}
+    for key in ("import_ms", "first_request_ms", "warm_request_ms", "process_ms"):
+        values = [s[key] for s in samples]
+        summary[key] = {"median": statistics.median(values), "min": min(values), "max": max(values)}
+    summary["status"] = samples[-1]["status"]
+    summary["modules_at_import"] = samples[-1]["modules_at_import"]
+    summary["modules_after_request"] = samples[-1]["modules_after_request"]
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5, help="fresh interpreters per case (default 5)")
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="run only these cases")
+    parser.add_argument("--max-import-ms", type=float, help="fail if a median import time exceeds this")
+    parser.add_argument("--max-first-request-ms", type=float, help="fail if a median first-request time exceeds this")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(_run_case(args.child)))
+        return 0
+
+    results = {}
+    for name in args.case or list(CASES):
+        results[name] = _summarize([_sample(name) for _ in range(max(1, args.repeats))])
+
+    failures = []
+    for name, summary in results.items():
+        if summary["status"] != 200:
+            failures.append(f"{name}: first request returned status {summary['status']}")
+        if "scipy.stats" in summary["modules_at_import"]:
+            failures.append(f"{name}: scipy.stats is imported at module load")
+        if args.max_import_ms is not None and summary["import_ms"]["median"] > args.max_import_ms:
+            failures.append(f"{name}: import {summary['import_ms']['median']:.0f} ms > {args.max_import_ms:.0f} ms")
+        if args.max_first_request_ms is not None and summary["first_request_ms"]["median"] > args.max_first_request_ms:
+            failures.append(
+                f"{name}: first request {summary['first_request_ms']['median']:.0f} ms > {args.max_first_request_ms:.0f} ms"
+            )
+
+    if args.json:
+        print(json.dumps({"python": sys.version.split()[0], "repeats": args.repeats, "results": results, "failures": failures}, indent=2))
+    else:
+        print(f"{'case':32} {'import':>9} {'first req':>10} {'warm req':>9} {'process':>9}  scipy loaded by first request")
+        for name, summary in results.items():
+            loaded = [m for m in summary["modules_after_request"] if m != "scipy"]
+            print(
+                f"{name:32} {summary['import_ms']['median']:7.1f}ms {summary['first_request_ms']['median']:8.1f}ms "
+                f"{summary['warm_request_ms']['median']:7.1f}ms {summary['process_ms']['median']:7.1f}ms  "
+                f"{', '.join(loaded) or '-'}"
+            )
+        for failure in failures:
+            print(f"FAIL {failure}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+pytest setup for the cloud-function tests
+
+Each function's tests sit next to its main.py (`<function>/test_<function>.py`)
+and call its entry point with a stand-in for the Flask request, as the
+function framework would.
+
+    python -m pytest cloud-functions -q
+"""
+
+import importlib.util
+import json
+import os
+import sys
+from typing import Any, Dict
+
+FUNCTIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Request:
+    """Minimal stand-in for the Flask request the functions receive"""
+
+    def __init__(self, body: Any, method: str = "POST"):
+        self.method = method
+        self.data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.headers: Dict[str, str] = {"Content-Type": "application/json"}
+        self.args: Dict[str, str] = {}
+
+    def get_json(self, silent: bool = False, force: bool = False):
+        try:
+            return json.loads(self.data)
+        except ValueError:
+            if silent:
+                return None
+            raise
+
+    def get_data(self, *args, **kwargs):
+        return self.data
+
+
+def load_function(directory: str):
+    """Import cloud-functions/<directory>/main.py as a fresh module"""
+    path = os.path.join(FUNCTIONS_DIR, directory, "main.py")
+    name = f"{directory}_main"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
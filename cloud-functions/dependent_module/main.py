@@ -10,191 +10,429 @@ Endpoints:
 """
 
 import math
+import os
+import sys
 from typing import Any, Dict
 import numpy as np
-from scipy import stats
+
+# statistico_core is copied next to main.py for deployment; in the repository
+# it sits beside the function directories
+_HERE = os.path.dirname(os.path.abspath(__file__))
+if not os.path.isdir(os.path.join(_HERE, "statistico_core")):
+    sys.path.insert(0, os.path.dirname(_HERE))
+
+from statistico_core import (
+    accumulate, as_bool, close_session, decode_column, json_response, lazy_import, open_session,
+    reservoir_sample, rm_anova_power_analysis, t_power, tail_pvalue,
+)
+
+# Imported on first use by the permutation, bootstrap and session operations
+stats = lazy_import("scipy.stats")
 
 
 ENGINE_NOTICE = "Dependent module powered by SciPy with exact/simulation methods"
 
+# Sign-flip permutation tests: exact enumeration up to 2^20 patterns, and
+# flip-matrix entries held in memory per block
+EXACT_SIGN_FLIP_MAX_N = 20
+SIGN_FLIP_BLOCK_ELEMENTS = 4_000_000
+
+# Paired bootstrap: supported statistics and resample entries per block
+BOOTSTRAP_STATISTICS = ("mean_difference", "median_difference", "trimmed_mean_difference", "cohen_dz")
+BOOTSTRAP_BLOCK_ELEMENTS = 4_000_000
+
 
 def _response(payload: Dict[str, Any], status: int = 200):
     """Build JSON response with CORS headers"""
-    body = dict(payload or {})
-    body.setdefault("engine_notice", ENGINE_NOTICE)
-    headers = {
-        "Content-Type": "application/json",
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Headers": "Content-Type, Authorization",
-        "Access-Control-Allow-Methods": "POST, OPTIONS",
-    }
-    return body, status, headers
+    return json_response(payload, status, ENGINE_NOTICE)
 
 
 # ===== POWER ANALYSIS =====
 
-def _calculate_cohen_f_from_partial_eta_squared(partial_eta_sq: float) -> float:
-    """Convert partial eta squared to Cohen's f"""
-    if partial_eta_sq <= 0 or partial_eta_sq >= 1:
-        return 0.0
-    return math.sqrt(partial_eta_sq / (1 - partial_eta_sq))
+def handle_power_analysis(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle power analysis requests"""
+    mode, alpha, results = rm_anova_power_analysis(data)
+    return {
+        "ok": True,
+        "operation": "power_analysis",
+        "input": {"mode": mode, "alpha": alpha},
+        "results": results
+    }
 
 
-def _calculate_observed_power_rm_anova(
-    f_statistic: float,
-    df_between: int,
-    df_error: int,
-    alpha: float = 0.05
-) -> float:
-    """Calculate observed power using non-central F distribution"""
-    if f_statistic <= 0 or df_between <= 0 or df_error <= 0:
-        return 0.0
-    
-    try:
-        f_crit = stats.f.ppf(1 - alpha, df_between, df_error)
-        ncp = f_statistic * df_between
-        power = 1 - stats.ncf.cdf(f_crit, df_between, df_error, ncp)
-        return float(max(0.0, min(1.0, power)))
-    except Exception:
-        return 0.0
-
-
-def _calculate_required_sample_size_rm_anova(
-    effect_size_f: float,
-    num_timepoints: int,
-    target_power: float = 0.80,
-    alpha: float = 0.05,
-    max_iterations: int = 100
-) -> int:
-    """Calculate required sample size for target power"""
-    if effect_size_f <= 0 or num_timepoints < 2:
-        return 0
-    
-    df_between = num_timepoints - 1
-    n_min, n_max = 2, 1000
-    
-    for _ in range(max_iterations):
-        n = (n_min + n_max) // 2
-        df_error = (n - 1) * df_between
-        ncp = n * (effect_size_f ** 2) * df_between
-        
-        try:
-            f_crit = stats.f.ppf(1 - alpha, df_between, df_error)
-            power = 1 - stats.ncf.cdf(f_crit, df_between, df_error, ncp)
-            
-            if abs(power - target_power) < 0.01:
-                return n
-            
-            if power < target_power:
-                n_min = n + 1
-            else:
-                n_max = n - 1
-        except Exception:
-            n_min = n + 1
-    
-    return n_max if n_max >= 2 else 2
+# ===== PERMUTATION TESTS =====
 
+def _parse_paired(data: Dict[str, Any]) -> np.ndarray:
+    """Paired differences from 'differences' or 'group_a'/'group_b' (incomplete pairs dropped)"""
+    diffs = _paired_differences(data)
+    if diffs.size < 2:
+        raise ValueError("At least 2 complete pairs are required")
+    return diffs
 
-def handle_power_analysis(data: Dict[str, Any]) -> Dict[str, Any]:
-    """Handle power analysis requests"""
-    mode = str(data.get("mode", "observed")).strip().lower()
-    alpha = float(data.get("alpha", 0.05))
-    alpha = max(0.001, min(0.25, alpha))
+
+def _paired_differences(data: Dict[str, Any]) -> np.ndarray:
+    """Finite paired differences, with no minimum count (chunks may be small)"""
+    if "differences" in data:
+        diffs = decode_column("differences", data["differences"])
+    else:
+        a = decode_column("group_a", data.get("group_a", []))
+        b = decode_column("group_b", data.get("group_b", []))
+        if a.size != b.size:
+            raise ValueError("'group_a' and 'group_b' must have the same length (paired data)")
+        diffs = a - b
+    return diffs[np.isfinite(diffs)]
+
+
+def _sign_flip_blocks_exact(n: int, block: int):
+    """All 2^n sign patterns as 0/1 flip matrices (bit j of the pattern code flips pair j)"""
+    shifts = np.arange(n, dtype=np.uint64)
+    total = 1 << n
+    for start in range(0, total, block):
+        codes = np.arange(start, min(total, start + block), dtype=np.uint64)
+        yield ((codes[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+
+
+def _sign_flip_blocks_random(n: int, n_resamples: int, block: int, rng: np.random.Generator):
+    """Random sign patterns drawn as packed bytes and unpacked to 0/1 flip matrices"""
+    n_bytes = (n + 7) // 8
+    for start in range(0, n_resamples, block):
+        size = min(block, n_resamples - start)
+        packed = rng.integers(0, 256, size=(size, n_bytes), dtype=np.uint8)
+        yield np.unpackbits(packed, axis=1, count=n)
+
+
+def _sign_flip_test(
+    diffs: np.ndarray,
+    alternative: str,
+    permutations: int,
+    seed: int,
+    block_size: Any = None
+) -> Dict[str, Any]:
+    """
+    Paired permutation test of the mean difference by sign flips
+
+    Flipping the pairs marked in a 0/1 matrix F changes the sum of differences
+    to sum(d) - 2 * F @ d, so each block of patterns costs one matrix product.
+    """
+    n = diffs.size
+    total = float(diffs.sum())
+    observed = total / n
+
+    exact = n <= EXACT_SIGN_FLIP_MAX_N or permutations >= 2 ** n
+    n_resamples = 2 ** n if exact else permutations
+    if block_size is None:
+        block = SIGN_FLIP_BLOCK_ELEMENTS // n
+    else:
+        block = int(block_size)
+    block = int(max(1, min(n_resamples, block)))
+
+    if exact:
+        blocks = _sign_flip_blocks_exact(n, block)
+    else:
+        blocks = _sign_flip_blocks_random(n, n_resamples, block, np.random.default_rng(seed))
+
+    # Relative tolerance for theoretically tied statistics (as in SciPy)
+    gamma = abs(np.finfo(float).eps * 100 * observed)
+    count_less = count_greater = 0
+    for flips in blocks:
+        null = (total - 2.0 * (flips @ diffs)) / n
+        count_less += int(np.count_nonzero(null <= observed + gamma))
+        count_greater += int(np.count_nonzero(null >= observed - gamma))
+
+    adjustment = 0 if exact else 1
+    p_less = (count_less + adjustment) / (n_resamples + adjustment)
+    p_greater = (count_greater + adjustment) / (n_resamples + adjustment)
+    return {
+        "statistic": observed,
+        "p_value": tail_pvalue(p_less, p_greater, alternative),
+        "method": "exact_enumeration" if exact else "monte_carlo",
+        "exact": bool(exact),
+        "n_resamples": int(n_resamples),
+        "block_size": block,
+    }
+
+
+def handle_permutation(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle paired sign-flip permutation test requests"""
+    diffs = _parse_paired(data)
     
-    # Extract effect size
-    effect_size_f = None
-    if "effect_size_f" in data:
-        effect_size_f = float(data["effect_size_f"])
-    elif "partial_eta_squared" in data:
-        partial_eta_sq = float(data["partial_eta_squared"])
-        effect_size_f = _calculate_cohen_f_from_partial_eta_squared(partial_eta_sq)
-    
-    results = {}
-    
-    if mode == "observed":
-        f_stat = float(data.get("f_statistic", 0))
-        df_between = int(data.get("df_between", 0))
-        df_error = int(data.get("df_error", 0))
-        n = int(data.get("n", 0))
-        k = int(data.get("k", 0))
-        
-        if f_stat <= 0 or df_between <= 0 or df_error <= 0:
-            raise ValueError("Invalid F statistic or degrees of freedom")
-        
-        observed_power = _calculate_observed_power_rm_anova(f_stat, df_between, df_error, alpha)
-        
-        if effect_size_f is None and n > 0 and k > 0:
-            effect_size_f = math.sqrt(f_stat * df_between / n)
-        
-        results = {
-            "observed_power": observed_power,
-            "effect_size_cohen_f": effect_size_f if effect_size_f else 0.0,
-            "f_statistic": f_stat,
-            "df_between": df_between,
-            "df_error": df_error,
-            "interpretation": _interpret_power(observed_power)
+    alternative = str(data.get("alternative", "two-sided")).strip().lower()
+    if alternative not in ("two-sided", "greater", "less"):
+        alternative = "two-sided"
+    permutations = int(data.get("permutations", 10000))
+    permutations = max(200, min(200000, permutations))
+    seed = int(data.get("seed", 42))
+    block_size = data.get("block_size")
+    if block_size is not None:
+        block_size = max(1, min(permutations, int(block_size)))
+    
+    perm = _sign_flip_test(diffs, alternative, permutations, seed, block_size)
+    paired_t = stats.ttest_1samp(diffs, 0.0, alternative=alternative)
+    sd = float(np.std(diffs, ddof=1))
+    
+    return {
+        "ok": True,
+        "operation": "permutation",
+        "input": {
+            "n_pairs": int(diffs.size),
+            "alternative": alternative,
+            "permutations": permutations,
+            "seed": seed,
+            "block_size": perm["block_size"]
+        },
+        "results": {
+            "mean_difference": perm["statistic"],
+            "effect_size_cohen_dz": float(perm["statistic"] / sd) if sd > 0 else 0.0,
+            "permutation_test": {
+                "p_value": perm["p_value"],
+                "method": perm["method"],
+                "exact": perm["exact"],
+                "n_resamples": perm["n_resamples"]
+            },
+            "paired_t": {
+                "statistic": float(paired_t.statistic),
+                "p_value": float(paired_t.pvalue)
+            }
         }
-        
-        if effect_size_f and effect_size_f > 0 and k > 0:
-            results["required_for_80pct"] = _calculate_required_sample_size_rm_anova(
-                effect_size_f, k, 0.80, alpha
-            )
-            results["required_for_90pct"] = _calculate_required_sample_size_rm_anova(
-                effect_size_f, k, 0.90, alpha
-            )
-    
-    elif mode == "required":
-        if effect_size_f is None or effect_size_f <= 0:
-            raise ValueError("Effect size required")
-        
-        k = int(data.get("k", 3))
-        if k < 2:
-            raise ValueError("Number of timepoints must be at least 2")
-        
-        target_power = float(data.get("target_power", 0.80))
-        target_power = max(0.50, min(0.99, target_power))
-        
-        required_n = _calculate_required_sample_size_rm_anova(effect_size_f, k, target_power, alpha)
-        
-        df_between = k - 1
-        df_error = (required_n - 1) * df_between
-        ncp = required_n * (effect_size_f ** 2) * df_between
-        
-        try:
-            f_crit = stats.f.ppf(1 - alpha, df_between, df_error)
-            achieved_power = 1 - stats.ncf.cdf(f_crit, df_between, df_error, ncp)
-        except Exception:
-            achieved_power = target_power
-        
-        results = {
-            "required_sample_size": required_n,
-            "achieved_power": float(achieved_power),
-            "effect_size_cohen_f": effect_size_f,
-            "target_power": target_power,
-            "num_timepoints": k,
-            "interpretation": f"You need {required_n} subjects to achieve {target_power*100:.0f}% power"
+    }
+
+
+# ===== BOOTSTRAP =====
+
+def _bootstrap_statistic(resamples: np.ndarray, statistic: str, trim: float) -> np.ndarray:
+    """Evaluate the statistic on every row of a (block, n) resample matrix at once"""
+    if statistic == "mean_difference":
+        return resamples.mean(axis=1)
+    if statistic == "median_difference":
+        return np.median(resamples, axis=1)
+    if statistic == "trimmed_mean_difference":
+        return stats.trim_mean(resamples, trim, axis=1)
+    sd = resamples.std(axis=1, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(sd > 0, resamples.mean(axis=1) / sd, 0.0)
+
+
+def _jackknife_values(diffs: np.ndarray, statistic: str, trim: float) -> np.ndarray:
+    """
+    Leave-one-out values of the statistic in closed form (no n x n matrix)
+
+    Means use running sums; median and trimmed mean use the sorted sample,
+    where dropping the value at rank r shifts the higher order statistics
+    down by one.
+    """
+    n = diffs.size
+    m = n - 1
+    if statistic in ("mean_difference", "cohen_dz"):
+        loo_mean = (diffs.sum() - diffs) / m
+        if statistic == "mean_difference":
+            return loo_mean
+        loo_ss = (np.square(diffs).sum() - np.square(diffs)) - m * np.square(loo_mean)
+        loo_sd = np.sqrt(np.maximum(loo_ss, 0.0) / max(1, m - 1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(loo_sd > 0, loo_mean / loo_sd, 0.0)
+    
+    s = np.sort(diffs)
+    r = np.arange(n)
+    
+    def remaining(k):
+        # k-th order statistic of the sample with rank r removed
+        return np.where(k < r, s[np.minimum(k, n - 1)], s[np.minimum(k + 1, n - 1)])
+    
+    if statistic == "median_difference":
+        if m % 2:
+            return remaining(np.full(n, m // 2))
+        return (remaining(np.full(n, m // 2 - 1)) + remaining(np.full(n, m // 2))) / 2
+    
+    g = int(trim * m)
+    csum = np.concatenate([[0.0], np.cumsum(s)])
+    window = np.where(
+        r < g,
+        csum[m - g + 1] - csum[g + 1],
+        np.where(r >= m - g, csum[m - g] - csum[g], csum[m - g + 1] - csum[g] - s),
+    )
+    return window / (m - 2 * g)
+
+
+def _bootstrap_intervals(
+    theta_hat: float,
+    distribution: np.ndarray,
+    jackknife: np.ndarray,
+    confidence_level: float
+) -> Dict[str, Any]:
+    """Percentile, basic and BCa intervals from one bootstrap distribution"""
+    tail = (1 - confidence_level) / 2
+    low, high = np.percentile(distribution, [100 * tail, 100 * (1 - tail)])
+    intervals = {
+        "percentile": [float(low), float(high)],
+        "basic": [float(2 * theta_hat - high), float(2 * theta_hat - low)],
+        "bca": None,
+    }
+    
+    # Bias correction from the share of resamples below the estimate
+    share = (np.count_nonzero(distribution < theta_hat) + np.count_nonzero(distribution <= theta_hat)) / (2 * distribution.size)
+    z0 = stats.norm.ppf(share)
+    # Acceleration from the jackknife skewness
+    dev = jackknife.mean() - jackknife
+    denom = 6.0 * np.sum(dev ** 2) ** 1.5
+    accel = float(np.sum(dev ** 3) / denom) if denom > 0 else 0.0
+    
+    z = stats.norm.ppf([tail, 1 - tail])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        adjusted = stats.norm.cdf(z0 + (z0 + z) / (1 - accel * (z0 + z)))
+    if np.all(np.isfinite(adjusted)):
+        low, high = np.percentile(distribution, 100 * adjusted)
+        intervals["bca"] = [float(low), float(high)]
+    
+    intervals["bias_correction_z0"] = float(z0) if np.isfinite(z0) else None
+    intervals["acceleration"] = accel
+    return intervals
+
+
+def handle_bootstrap(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle paired bootstrap confidence interval requests"""
+    diffs = _parse_paired(data)
+    
+    statistic = str(data.get("statistic", "mean_difference")).strip().lower()
+    if statistic not in BOOTSTRAP_STATISTICS:
+        raise ValueError(f"Unknown statistic: {statistic}. Use one of {', '.join(BOOTSTRAP_STATISTICS)}")
+    if statistic == "cohen_dz" and diffs.size < 3:
+        raise ValueError("Cohen's dz bootstrap requires at least 3 complete pairs")
+    trim = float(data.get("trim", 0.1))
+    trim = max(0.0, min(0.4, trim))
+    confidence_level = float(data.get("confidence_level", 0.95))
+    confidence_level = max(0.5, min(0.999, confidence_level))
+    n_resamples = int(data.get("n_resamples", 10000))
+    n_resamples = max(200, min(200000, n_resamples))
+    seed = int(data.get("seed", 42))
+    n = diffs.size
+    block = data.get("block_size")
+    block = int(block) if block is not None else BOOTSTRAP_BLOCK_ELEMENTS // n
+    block = max(1, min(n_resamples, block))
+    
+    theta_hat = float(_bootstrap_statistic(diffs[None, :], statistic, trim)[0])
+    
+    # Resample indices block by block; each block is one array operation
+    rng = np.random.default_rng(seed)
+    distribution = np.empty(n_resamples)
+    for start in range(0, n_resamples, block):
+        size = min(block, n_resamples - start)
+        idx = rng.integers(0, n, size=(size, n))
+        distribution[start:start + size] = _bootstrap_statistic(diffs[idx], statistic, trim)
+    
+    jackknife = _jackknife_values(diffs, statistic, trim)
+    intervals = _bootstrap_intervals(theta_hat, distribution, jackknife, confidence_level)
+    
+    return {
+        "ok": True,
+        "operation": "bootstrap",
+        "input": {
+            "n_pairs": int(n),
+            "statistic": statistic,
+            "confidence_level": confidence_level,
+            "n_resamples": n_resamples,
+            "seed": seed,
+            "block_size": block,
+            **({"trim": trim} if statistic == "trimmed_mean_difference" else {})
+        },
+        "results": {
+            "estimate": theta_hat,
+            "standard_error": float(distribution.std(ddof=1)),
+            "bias": float(distribution.mean() - theta_hat),
+            "confidence_intervals": intervals
         }
+    }
+
+
+# ===== CHUNKED SESSIONS =====
+
+def _t_power_paired(alpha: float, n: int, effect_size_dz: float, alternative: str) -> float:
+    """Paired t-test power via the noncentral t distribution"""
+    return t_power(alpha, max(1, n - 1), effect_size_dz * math.sqrt(n), alternative)
+
+
+def handle_session_chunk(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Add one chunk of paired data to a session"""
+    diffs = _paired_differences(data)
+    session_id, session = open_session(
+        "dependent_module", data.get("session_id"), data, create=True, streams=("differences",),
+    )
+    with session["lock"]:
+        acc = session["streams"]["differences"]
+        accumulate(acc, diffs, session["rng"])
+        session["chunks"] += 1
+        n, chunks = acc["n"], session["chunks"]
     
     return {
         "ok": True,
-        "operation": "power_analysis",
-        "input": {"mode": mode, "alpha": alpha},
-        "results": results
+        "operation": "session_chunk",
+        "session_id": session_id,
+        "input": {"n_pairs": int(diffs.size)},
+        "results": {"chunks": chunks, "n_pairs": int(n)}
     }
 
 
-def _interpret_power(power: float) -> str:
-    """Provide interpretation of power value"""
-    if power >= 0.90:
-        return "Excellent power - very likely to detect true effects"
-    elif power >= 0.80:
-        return "Good power - adequate for most research purposes"
-    elif power >= 0.60:
-        return "Moderate power - may miss some true effects"
-    elif power >= 0.40:
-        return "Low power - likely to miss true effects"
+def handle_session_result(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Paired t, dz and power from the session's running summary"""
+    session_id, session = open_session(
+        "dependent_module", data.get("session_id"), data, create=False, streams=("differences",),
+    )
+    with session["lock"]:
+        acc = session["streams"]["differences"]
+        n, mean, m2 = acc["n"], acc["mean"], acc["m2"]
+        sample = reservoir_sample(acc).copy()
+    if n < 2:
+        raise ValueError("At least 2 complete pairs are required")
+    if as_bool(data.get("close", True)):
+        close_session(session_id)
+    
+    alternative = str(data.get("alternative", "two-sided")).strip().lower()
+    if alternative not in ("two-sided", "greater", "less"):
+        alternative = "two-sided"
+    alpha = float(data.get("alpha", 0.05))
+    alpha = max(0.001, min(0.25, alpha))
+    
+    sd = math.sqrt(m2 / (n - 1))
+    df = n - 1
+    t_stat = mean / (sd / math.sqrt(n)) if sd > 0 else 0.0
+    if alternative == "greater":
+        p_value = stats.t.sf(t_stat, df)
+    elif alternative == "less":
+        p_value = stats.t.cdf(t_stat, df)
     else:
-        return "Very low power - insufficient to detect effects reliably"
+        p_value = 2 * stats.t.sf(abs(t_stat), df)
+    dz = mean / sd if sd > 0 else 0.0
+    
+    results = {
+        "n_pairs": int(n),
+        "mean_difference": float(mean),
+        "sd_difference": float(sd),
+        "effect_size_cohen_dz": float(dz),
+        "paired_t": {"statistic": float(t_stat), "df": int(df), "p_value": float(p_value)},
+        "power_estimate": {
+            "method": "noncentral-t approximation",
+            "value": _t_power_paired(alpha, n, dz, alternative)
+        },
+        "reservoir_size": int(sample.size)
+    }
+    
+    # Resampling runs on the reservoir sample, not the full column
+    if sample.size >= 2:
+        permutations = int(data.get("permutations", 10000))
+        permutations = max(200, min(200000, permutations))
+        perm = _sign_flip_test(sample, alternative, permutations, int(data.get("seed", 42)))
+        results["reservoir_permutation_test"] = {
+            "p_value": perm["p_value"],
+            "method": perm["method"],
+            "n_resamples": perm["n_resamples"]
+        }
+    
+    return {
+        "ok": True,
+        "operation": "session_result",
+        "session_id": session_id,
+        "input": {"alternative": alternative, "alpha": alpha},
+        "results": results
+    }
 
 
 # ===== MAIN ENTRY POINT =====
@@ -205,8 +443,9 @@ def dependent_module(request):
     
     Routes requests to appropriate handlers based on 'operation' parameter:
     - power: Power analysis for RM-ANOVA
-    - permutation: Permutation tests (future)
-    - bootstrap: Bootstrap CI (future)
+    - permutation: Paired sign-flip permutation tests
+    - bootstrap: Paired bootstrap CIs (percentile, basic, BCa)
+    - session_chunk / session_result: Chunked upload with running summaries
     - effect_sizes: Effect size calculations (future)
     """
     if request.method == "OPTIONS":
@@ -223,12 +462,21 @@ def dependent_module(request):
             result = handle_power_analysis(data)
             return _response(result, 200)
         
-        # Future operations
         elif operation == "permutation":
-            return _response({"ok": False, "error": "Permutation tests coming soon"}, 501)
+            result = handle_permutation(data)
+            return _response(result, 200)
         
         elif operation == "bootstrap":
-            return _response({"ok": False, "error": "Bootstrap CI coming soon"}, 501)
+            result = handle_bootstrap(data)
+            return _response(result, 200)
+        
+        elif operation == "session_chunk":
+            result = handle_session_chunk(data)
+            return _response(result, 200)
+        
+        elif operation == "session_result":
+            result = handle_session_result(data)
+            return _response(result, 200)
         
         else:
             return _response({"ok": False, "error": f"Unknown operation: {operation}"}, 400)
@@ -0,0 +1,140 @@
+"""
+dependent_module: paired tests and power against SciPy and brute-force enumeration
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from conftest import Request, load_function
+
+main = load_function("dependent_module")
+
+ALTERNATIVES = ("two-sided", "less", "greater")
+
+def call(body):
+    return main.dependent_module(Request(body))[0]
+
+
+@pytest.mark.parametrize("mode", ["curve", "required"])
+def test_power_matches_rm_anova_power(mode):
+    rm_anova_power = load_function("rm_anova_power")
+    body = {"mode": mode, "k": 3, "effect_size_f": 0.3, "effect_sizes_f": [0.2, 0.3], "target_powers": [0.8, 0.9],
+            "n_max": 150}
+    expected = rm_anova_power.rm_anova_power(Request(body))[0]["results"]
+    results = call({"operation": "power", **body})["results"]
+    shared = [key for key in expected if key in results]
+    assert "curves" in shared if mode == "curve" else "required_sample_size" in shared
+    assert {key: results[key] for key in shared} == {key: expected[key] for key in shared}
+
+
+def sign_flip_sums(d):
+    """Sum of d under every sign pattern, from the outer sum of the two halves' patterns"""
+    half = d.size // 2
+
+    def sums(part):
+        return np.array([np.dot(signs, part) for signs in itertools.product((1, -1), repeat=part.size)])
+    return np.add.outer(sums(d[:half]), sums(d[half:])).ravel()
+
+
+def tail_pvalue(null, observed, alternative):
+    tol = 1e-9 * max(1.0, abs(observed))
+    p_less, p_greater = np.mean(null <= observed + tol), np.mean(null >= observed - tol)
+    return {"less": p_less, "greater": p_greater}.get(alternative, min(1.0, 2 * min(p_less, p_greater)))
+
+
+@pytest.mark.parametrize("alternative", ALTERNATIVES)
+def test_exact_sign_flip_matches_scipy(alternative):
+    diffs = np.array([1.5, -0.5, 2.0, 1.5, 0.25, 3.0, -1.5, 2.0, 0.5, 1.0, 2.5, -0.75])
+    perm = call({"operation": "permutation", "differences": diffs.tolist(), "alternative": alternative})
+    perm = perm["results"]["permutation_test"]
+    expected = stats.permutation_test((diffs,), np.mean, permutation_type="samples", n_resamples=np.inf,
+                                      alternative=alternative, vectorized=True)
+    assert perm["method"] == "exact_enumeration"
+    assert perm["n_resamples"] == 2 ** 12
+    assert perm["p_value"] == pytest.approx(expected.pvalue, abs=1e-12)
+
+
+@pytest.mark.parametrize("alternative", ALTERNATIVES)
+def test_monte_carlo_sign_flip_is_near_enumeration(alternative):
+    rng = np.random.default_rng(3)
+    diffs = rng.normal(0.4, 1, 21).round(2)
+    exact = tail_pvalue(sign_flip_sums(diffs), diffs.sum(), alternative)
+    body = {"operation": "permutation", "differences": diffs.tolist(), "alternative": alternative,
+            "permutations": 200000, "seed": 1}
+    perm = call(body)["results"]["permutation_test"]
+    assert perm["method"] == "monte_carlo"
+    assert abs(perm["p_value"] - exact) < 4 * np.sqrt(exact * (1 - exact) / 200000) + 1e-5
+
+
+def test_paired_columns_match_paired_t():
+    a = [5.1, 4.8, 6.0, 5.5, 5.9, 4.7, 5.2, 6.1]
+    b = [4.9, 4.9, 5.1, 5.0, 5.2, 4.8, 4.6, 5.5]
+    results = call({"operation": "permutation", "group_a": a, "group_b": b})["results"]
+    expected = stats.ttest_rel(a, b)
+    d = np.subtract(a, b)
+    assert results["paired_t"]["statistic"] == pytest.approx(expected.statistic, rel=1e-12)
+    assert results["paired_t"]["p_value"] == pytest.approx(expected.pvalue, rel=1e-12)
+    assert results["effect_size_cohen_dz"] == pytest.approx(d.mean() / d.std(ddof=1), rel=1e-12)
+
+
+BOOTSTRAP_STATISTICS = {
+    "mean_difference": np.mean,
+    "median_difference": np.median,
+    "trimmed_mean_difference": lambda a, axis=-1: stats.trim_mean(a, 0.1, axis=axis),
+    "cohen_dz": lambda a, axis=-1: np.mean(a, axis=axis) / np.std(a, axis=axis, ddof=1),
+}
+
+
+@pytest.mark.parametrize("statistic", BOOTSTRAP_STATISTICS)
+def test_bootstrap_intervals_match_scipy_for_a_seed(statistic):
+    # One block holds all resamples, so the indices are SciPy's for the same seed.
+    diffs = np.random.default_rng(12).gamma(2, 1, 25) - 1.5
+    body = {"operation": "bootstrap", "differences": diffs.tolist(), "statistic": statistic,
+            "n_resamples": 5000, "seed": 4}
+    intervals = call(body)["results"]["confidence_intervals"]
+    for method in ("percentile", "basic", "bca"):
+        expected = stats.bootstrap((diffs,), BOOTSTRAP_STATISTICS[statistic], n_resamples=5000, method=method,
+                                   random_state=np.random.default_rng(4), vectorized=True).confidence_interval
+        assert intervals[method] == pytest.approx([expected.low, expected.high], rel=1e-9, abs=1e-12)
+
+
+@pytest.mark.parametrize("n", [9, 10])
+@pytest.mark.parametrize("statistic", BOOTSTRAP_STATISTICS)
+def test_closed_form_jackknife_matches_leave_one_out(statistic, n):
+    diffs = np.random.default_rng(n).normal(0.5, 1, n)
+    loo = [BOOTSTRAP_STATISTICS[statistic](np.delete(diffs, i)) for i in range(n)]
+    # Order statistics come back in rank order; the acceleration only needs the values.
+    jackknife = np.sort(main._jackknife_values(diffs, statistic, 0.1))
+    np.testing.assert_allclose(jackknife, np.sort(loo), rtol=1e-10, atol=1e-12)
+
+
+def test_chunked_session_equals_the_one_shot_paired_test():
+    rng = np.random.default_rng(2)
+    a, b = rng.normal(5, 1, 80), rng.normal(4.7, 1, 80)
+    session_id = None
+    for start, stop in [(0, 13), (13, 50), (50, 80)]:
+        chunk = {"group_a": a[start:stop].tolist(), "group_b": b[start:stop].tolist()}
+        response = call({"operation": "session_chunk", **chunk, **({"session_id": session_id} if session_id else {})})
+        session_id = response["session_id"]
+    assert response["results"]["n_pairs"] == 80
+    body = {"operation": "session_result", "session_id": session_id, "alternative": "greater", "seed": 3}
+    results = call(body)["results"]
+    expected = stats.ttest_rel(a, b, alternative="greater")
+    d = a - b
+    assert results["mean_difference"] == pytest.approx(d.mean(), rel=1e-12)
+    assert results["sd_difference"] == pytest.approx(d.std(ddof=1), rel=1e-12)
+    assert results["paired_t"]["statistic"] == pytest.approx(expected.statistic, rel=1e-10)
+    assert results["paired_t"]["p_value"] == pytest.approx(expected.pvalue, rel=1e-10)
+    one_shot = call({"operation": "permutation", "differences": d.tolist(), "alternative": "greater", "seed": 3})
+    assert results["reservoir_permutation_test"]["p_value"] == one_shot["results"]["permutation_test"]["p_value"]
+
+
+def test_sessions_are_kept_per_function():
+    engine = load_function("permutation_engine")
+    opened = engine.permutation_engine(Request({"operation": "session_chunk", "group_a": [1.0, 2.0]}))[0]
+    response = call({"operation": "session_chunk", "session_id": opened["session_id"], "differences": [1.0]})
+    assert response["ok"] is False
+    assert response["error"] == f"Unknown or expired session: {opened['session_id']}"
@@ -1,40 +1,75 @@
+import itertools
 import math
-from typing import Any, Dict, List
+import multiprocessing
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
-from scipy import stats
+
+# statistico_core is copied next to main.py for deployment; in the repository
+# it sits beside the function directories
+_HERE = os.path.dirname(os.path.abspath(__file__))
+if not os.path.isdir(os.path.join(_HERE, "statistico_core")):
+    sys.path.insert(0, os.path.dirname(_HERE))
+
+from statistico_core import (
+    accumulate, accumulator_summary, as_bool, close_session, decode_column, json_response, lazy_import,
+    open_session, reservoir_sample, t_power, tail_pvalue,
+)
+
+# Imported by the first request rather than at cold start
+stats = lazy_import("scipy.stats")
 
 
 ENGINE_NOTICE = "Resampling and power calculations use SciPy-based engine"
 
+# Upper bound on permutation index entries held in memory for one block.
+PERMUTATION_BLOCK_ELEMENTS = 4_000_000
+
+# Exact-mode tractability limits: enumerated group splits, and
+# (values x subset size x sum range) cells touched by the subset-sum DP.
+EXACT_ENUMERATION_LIMIT = 250_000
+EXACT_DP_MAX_WORK = 200_000_000
+LATTICE_MAX_DECIMALS = 6
+# Largest lattice rounding error accepted, relative to the data's magnitude:
+# float noise in decimal input, far below any difference between real values.
+LATTICE_RTOL = 1e-12
+
+# Sequential Monte Carlo: resamples before the first look, and default
+# probability that early stopping reaches the wrong side of alpha.
+SEQUENTIAL_FIRST_LOOK = 100
+SEQUENTIAL_ERROR = 0.001
+
+# Parallel resampling: upper bound on seed streams / worker shares per request.
+MAX_WORKERS = 32
+
+# Batch comparisons: request size limit and supported multiplicity corrections.
+MAX_BATCH_COMPARISONS = 500
+P_ADJUST_METHODS = ("holm", "bh", "bonferroni", "none")
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_SIZE = 0
+
 
 def _response(payload: Dict[str, Any], status: int = 200):
-    body = dict(payload or {})
-    body.setdefault("engine_notice", ENGINE_NOTICE)
-    headers = {
-        "Content-Type": "application/json",
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Headers": "Content-Type, Authorization",
-        "Access-Control-Allow-Methods": "POST, OPTIONS",
-    }
-    return body, status, headers
+    return json_response(payload, status, ENGINE_NOTICE)
+
+
+def _finite_column(name: str, data: Dict[str, Any]) -> np.ndarray:
+    arr = decode_column(name, data.get(name, []))
+    finite = np.isfinite(arr)
+    if not finite.all():
+        arr = arr[finite]
+    return arr
 
 
 def _parse_array(name: str, data: Dict[str, Any]) -> np.ndarray:
-    values = data.get(name, [])
-    if not isinstance(values, list):
-        raise ValueError(f"'{name}' must be an array of numbers.")
-    parsed = []
-    for v in values:
-        if v is None:
-            continue
-        try:
-            f = float(v)
-        except (TypeError, ValueError):
-            continue
-        if math.isfinite(f):
-            parsed.append(f)
-    arr = np.asarray(parsed, dtype=float)
+    arr = _finite_column(name, data)
     if arr.size < 2:
         raise ValueError(f"'{name}' must contain at least 2 numeric values.")
     return arr
@@ -53,19 +88,414 @@ def _t_power_two_sample(alpha: float, n1: int, n2: int, effect_size_d: float, al
     # Approximate analytical power via noncentral t distribution.
     df = max(1, n1 + n2 - 2)
     n_eff = (n1 * n2) / max(1, (n1 + n2))
-    ncp = effect_size_d * np.sqrt(n_eff)
-    tcrit = stats.t.ppf(1 - alpha / 2, df) if alternative == "two-sided" else stats.t.ppf(1 - alpha, df)
-    nct = stats.nct(df, ncp)
-    if alternative == "greater":
-        power = 1.0 - nct.cdf(tcrit)
-    elif alternative == "less":
-        power = nct.cdf(-tcrit)
+    return t_power(alpha, df, effect_size_d * np.sqrt(n_eff), alternative)
+
+
+def _spawn_streams(seed: int, workers: int) -> Tuple[list, list]:
+    # Independent per-worker streams for permutations and bootstrap. Results
+    # depend only on (seed, workers), never on pool size or scheduling.
+    perm_root, boot_root = np.random.SeedSequence(seed).spawn(2)
+    return perm_root.spawn(workers), boot_root.spawn(workers)
+
+
+def _split_count(total: int, parts: int) -> List[int]:
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+
+
+def _process_pool(size: int):
+    global _POOL, _POOL_SIZE
+    if _POOL is None or _POOL_SIZE < size:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False)
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        _POOL = ProcessPoolExecutor(max_workers=size, mp_context=context)
+        _POOL_SIZE = size
+    return _POOL
+
+
+def _run_shares(func, share_args: List[tuple], workers: int) -> list:
+    # Fan shares out over the process pool; run them in-process when only one
+    # core is available or the pool cannot be used. Both give identical output.
+    global _POOL
+    size = min(workers, os.cpu_count() or 1)
+    if size > 1:
+        try:
+            pool = _process_pool(size)
+            futures = [pool.submit(func, *args) for args in share_args]
+            return [f.result() for f in futures]
+        except (OSError, BrokenProcessPool, pickle.PicklingError):
+            if _POOL is not None:
+                _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = None
+    return [func(*args) for args in share_args]
+
+
+def _permutation_block_size(n_total: int, n_resamples: int, block_size: Any = None) -> int:
+    if block_size is None:
+        block = PERMUTATION_BLOCK_ELEMENTS // max(1, n_total)
+    else:
+        block = int(block_size)
+    return int(max(1, min(n_resamples, block)))
+
+
+def _block_sizes(n_resamples: int, block: int, checkpoints: List[int] = ()):
+    # Split n_resamples into blocks of at most `block`, never straddling a checkpoint.
+    boundaries = sorted({c for c in checkpoints if 0 < c < n_resamples} | {n_resamples})
+    done = 0
+    for boundary in boundaries:
+        while done < boundary:
+            size = min(block, boundary - done)
+            yield size
+            done += size
+
+
+def _random_split_blocks(n_total: int, sizes, seed: int):
+    # Draw permutations from the same legacy RandomState stream that
+    # stats.permutation_test uses, so p-values are unchanged for a given seed.
+    rng = np.random.RandomState(seed)
+    for size in sizes:
+        yield np.stack([rng.permutation(n_total) for _ in range(size)])
+
+
+def _null_tail_counts(
+    pooled: np.ndarray, n_a: int, indices: np.ndarray, observed: float, gamma: float
+) -> Tuple[int, int]:
+    resampled = pooled[indices]
+    null = np.mean(resampled[:, :n_a], axis=1) - np.mean(resampled[:, n_a:], axis=1)
+    return int(np.count_nonzero(null <= observed + gamma)), int(np.count_nonzero(null >= observed - gamma))
+
+
+def _permutation_share(
+    pooled: np.ndarray, n_a: int, observed: float, gamma: float, n_resamples: int, block: int, stream
+) -> Tuple[int, int]:
+    # One worker's share of Monte Carlo permutations, drawn from its own stream.
+    rng = np.random.default_rng(stream)
+    base = np.arange(pooled.size)
+    count_less = count_greater = 0
+    for size in _block_sizes(n_resamples, block):
+        indices = rng.permuted(np.tile(base, (size, 1)), axis=1)
+        less, greater = _null_tail_counts(pooled, n_a, indices, observed, gamma)
+        count_less += less
+        count_greater += greater
+    return count_less, count_greater
+
+
+def _exact_split_blocks(n_total: int, n_a: int, block: int):
+    # Enumerate every assignment of n_a pooled observations to group A.
+    combos = itertools.combinations(range(n_total), n_a)
+    while True:
+        chunk = np.fromiter(
+            itertools.chain.from_iterable(itertools.islice(combos, block)), dtype=np.intp
+        )
+        if chunk.size == 0:
+            return
+        idx_a = chunk.reshape(-1, n_a)
+        mask = np.ones((idx_a.shape[0], n_total), dtype=bool)
+        np.put_along_axis(mask, idx_a, False, axis=1)
+        idx_b = np.nonzero(mask)[1].reshape(idx_a.shape[0], n_total - n_a)
+        yield np.concatenate([idx_a, idx_b], axis=1)
+
+
+def _permutation_pvalue(count_less: int, count_greater: int, n_resamples: int, exact: bool, alternative: str) -> float:
+    adjustment = 0 if exact else 1
+    p_less = (count_less + adjustment) / (n_resamples + adjustment)
+    p_greater = (count_greater + adjustment) / (n_resamples + adjustment)
+    return tail_pvalue(p_less, p_greater, alternative)
+
+
+def _sequential_checkpoints(n_resamples: int) -> List[int]:
+    # Doubling look schedule: few looks keep the per-look error budget large.
+    checkpoints = []
+    look = SEQUENTIAL_FIRST_LOOK
+    while look < n_resamples:
+        checkpoints.append(look)
+        look *= 2
+    return checkpoints + [n_resamples]
+
+
+def _clopper_pearson(count: int, n: int, error: float) -> Tuple[float, float]:
+    lo = 0.0 if count == 0 else float(stats.beta.ppf(error / 2, count, n - count + 1))
+    hi = 1.0 if count == n else float(stats.beta.ppf(1 - error / 2, count + 1, n - count))
+    return lo, hi
+
+
+def _sequential_decision(
+    count_less: int,
+    count_greater: int,
+    n: int,
+    alpha: float,
+    alternative: str,
+    error: float,
+) -> Optional[str]:
+    # Stop once a confidence interval for the true permutation p-value lies
+    # entirely below or above alpha.
+    if alternative == "two-sided":
+        less = _clopper_pearson(count_less, n, error / 2)
+        greater = _clopper_pearson(count_greater, n, error / 2)
+        lo, hi = 2 * min(less[0], greater[0]), 2 * min(less[1], greater[1])
     else:
-        power = (1.0 - nct.cdf(tcrit)) + nct.cdf(-tcrit)
-    return float(max(0.0, min(1.0, power)))
+        lo, hi = _clopper_pearson(count_less if alternative == "less" else count_greater, n, error)
+    if hi < alpha:
+        return "reject"
+    if lo > alpha:
+        return "fail_to_reject"
+    return None
+
+
+def _lattice_integers(values: np.ndarray) -> Optional[np.ndarray]:
+    # Spreadsheet data rarely carries more than a few decimals, so the shifted
+    # values usually sit on an integer lattice after scaling by 10**decimals.
+    # The tolerance scales with the data, so small-scale values or near-ties
+    # never collapse onto one lattice point; such data is enumerated instead.
+    shifted = values - values.min()
+    tolerance = LATTICE_RTOL * float(np.max(np.abs(values)))
+    for decimals in range(LATTICE_MAX_DECIMALS + 1):
+        scale = 10 ** decimals
+        scaled = shifted * scale
+        rounded = np.round(scaled)
+        if rounded.max() > 2 ** 52:
+            return None
+        if np.all(np.abs(scaled - rounded) <= tolerance * scale):
+            lattice = rounded.astype(np.int64)
+            step = int(np.gcd.reduce(lattice))
+            return lattice // step if step > 1 else lattice
+    return None
+
+
+def _subset_sum_counts(values: np.ndarray, k: int, max_sum: int) -> np.ndarray:
+    # counts[j, s] = number of size-j subsets of `values` summing to s.
+    counts = np.zeros((k + 1, max_sum + 1))
+    counts[0, 0] = 1.0
+    for v in values.tolist():
+        # NumPy buffers overlapping operands, so every row reads its
+        # pre-update values (0/1 knapsack semantics).
+        counts[1:, v:] += counts[:-1, : max_sum + 1 - v]
+    return counts[k]
+
+
+def _exact_subset_sum_test(x: np.ndarray, y: np.ndarray, alternative: str) -> Optional[Dict[str, Any]]:
+    # The mean difference is an increasing function of the group-A sum, so the
+    # exact permutation distribution follows from counting subset sums.
+    pooled = np.concatenate([x, y])
+    lattice = _lattice_integers(pooled)
+    if lattice is None:
+        return None
+
+    n_a, n_total = x.size, pooled.size
+    use_a = n_a <= n_total - n_a
+    k = n_a if use_a else n_total - n_a
+    max_sum = int(np.sort(lattice)[-k:].sum())
+    if n_total * (k + 1) * (max_sum + 1) > EXACT_DP_MAX_WORK:
+        return None
+
+    counts = _subset_sum_counts(lattice, k, max_sum)
+    total = counts.sum()
+    if not np.isfinite(total) or total <= 0:
+        return None
+    dist = counts / total
+
+    observed_sum = int(lattice[:n_a].sum() if use_a else lattice[n_a:].sum())
+    p_upper = float(dist[observed_sum:].sum())
+    p_lower = float(dist[: observed_sum + 1].sum())
+    p_less, p_greater = (p_lower, p_upper) if use_a else (p_upper, p_lower)
+    return {
+        "statistic": float(np.mean(x) - np.mean(y)),
+        "p_value": tail_pvalue(p_less, p_greater, alternative),
+        "method": "exact_subset_sum",
+        "exact": True,
+        "n_resamples": math.comb(n_total, n_a),
+        "block_size": None,
+        "workers": 1,
+    }
+
+
+def _permutation_test_mean_diff(
+    x: np.ndarray,
+    y: np.ndarray,
+    alternative: str,
+    permutations: int,
+    seed: int,
+    block_size: Any = None,
+    method: str = "auto",
+    sequential: bool = False,
+    alpha: float = 0.05,
+    sequential_error: float = SEQUENTIAL_ERROR,
+    workers: int = 1,
+) -> Dict[str, Any]:
+    # Block-vectorized equivalent of stats.permutation_test for the difference
+    # in means: each block of permutations is gathered into one index matrix
+    # and the statistic is evaluated for the whole block at once.
+    if method == "auto":
+        result = _exact_subset_sum_test(x, y, alternative)
+        if result is not None:
+            return result
+
+    pooled = np.concatenate([x, y])
+    n_a, n_total = x.size, pooled.size
+    observed = float(np.mean(x) - np.mean(y))
+
+    n_splits = math.comb(n_total, n_a)
+    exact = permutations >= n_splits or (method == "auto" and n_splits <= EXACT_ENUMERATION_LIMIT)
+    n_resamples = n_splits if exact else permutations
+    block = _permutation_block_size(n_total, n_resamples, block_size)
+    sequential = sequential and not exact
+    checkpoints = _sequential_checkpoints(n_resamples) if sequential else []
+    # Bonferroni split of the wrong-decision probability across all looks.
+    look_error = sequential_error / max(1, len(checkpoints))
+    parallel = workers > 1 and not exact and not sequential
+    if exact:
+        blocks = _exact_split_blocks(n_total, n_a, block)
+    elif not parallel:
+        blocks = _random_split_blocks(n_total, _block_sizes(n_resamples, block, checkpoints), seed)
+
+    # Same relative tolerance SciPy applies to theoretically tied statistics.
+    gamma = abs(np.finfo(float).eps * 100 * observed)
+    count_less = count_greater = done = 0
+    decision = None
+    if parallel:
+        streams = _spawn_streams(seed, workers)[0]
+        shares = _split_count(n_resamples, workers)
+        blocks = []
+        counts = _run_shares(
+            _permutation_share,
+            [(pooled, n_a, observed, gamma, share, block, stream) for share, stream in zip(shares, streams)],
+            workers,
+        )
+        count_less = sum(c[0] for c in counts)
+        count_greater = sum(c[1] for c in counts)
+        done = n_resamples
+    for indices in blocks:
+        less, greater = _null_tail_counts(pooled, n_a, indices, observed, gamma)
+        count_less += less
+        count_greater += greater
+        done += indices.shape[0]
+        if sequential and done in checkpoints:
+            decision = _sequential_decision(count_less, count_greater, done, alpha, alternative, look_error)
+            if decision is not None:
+                break
+
+    result = {
+        "statistic": observed,
+        "p_value": _permutation_pvalue(count_less, count_greater, done, exact, alternative),
+        "method": "exact_enumeration" if exact else "monte_carlo",
+        "exact": bool(exact),
+        "n_resamples": int(done),
+        "block_size": block,
+        "workers": workers if parallel else 1,
+    }
+    if sequential:
+        result["sequential"] = {
+            "decision": decision or "undecided",
+            "stopped_early": done < n_resamples,
+            "max_resamples": int(n_resamples),
+            "error_tolerance": sequential_error,
+        }
+    return result
+
 
+def _permutation_test_mean_diff_many(
+    pairs: List[Tuple[np.ndarray, np.ndarray]],
+    alternative: str,
+    permutations: int,
+    seed: int,
+    block_size: Any = None,
+    method: str = "auto",
+) -> List[Dict[str, Any]]:
+    # Batch form of _permutation_test_mean_diff. Pairs with equal group sizes
+    # share one stream of permutation index blocks, and each block is applied
+    # to all of them at once. Every pair sees the same permutations it would
+    # in a single request, so results match one-pair-at-a-time calls.
+    results: List[Optional[Dict[str, Any]]] = [None] * len(pairs)
+    by_shape: Dict[Tuple[int, int], List[int]] = {}
+    for i, (x, y) in enumerate(pairs):
+        if method == "auto":
+            results[i] = _exact_subset_sum_test(x, y, alternative)
+        if results[i] is None:
+            by_shape.setdefault((x.size, y.size), []).append(i)
+
+    for (n_a, n_b), members in by_shape.items():
+        n_total = n_a + n_b
+        pooled = np.stack([np.concatenate(pairs[i]) for i in members])
+        observed = np.array([np.mean(pairs[i][0]) - np.mean(pairs[i][1]) for i in members])
+        n_splits = math.comb(n_total, n_a)
+        exact = permutations >= n_splits or (method == "auto" and n_splits <= EXACT_ENUMERATION_LIMIT)
+        n_resamples = n_splits if exact else permutations
+        block = _permutation_block_size(n_total * len(members), n_resamples, block_size)
+        if exact:
+            blocks = _exact_split_blocks(n_total, n_a, block)
+        else:
+            blocks = _random_split_blocks(n_total, _block_sizes(n_resamples, block), seed)
+
+        gamma = np.abs(np.finfo(float).eps * 100 * observed)
+        count_less = np.zeros(len(members), dtype=np.int64)
+        count_greater = np.zeros(len(members), dtype=np.int64)
+        for indices in blocks:
+            resampled = pooled[:, indices]
+            null = np.mean(resampled[:, :, :n_a], axis=2) - np.mean(resampled[:, :, n_a:], axis=2)
+            count_less += np.count_nonzero(null <= (observed + gamma)[:, None], axis=1)
+            count_greater += np.count_nonzero(null >= (observed - gamma)[:, None], axis=1)
+
+        for j, i in enumerate(members):
+            results[i] = {
+                "statistic": float(observed[j]),
+                "p_value": _permutation_pvalue(int(count_less[j]), int(count_greater[j]), n_resamples, exact, alternative),
+                "method": "exact_enumeration" if exact else "monte_carlo",
+                "exact": bool(exact),
+                "n_resamples": int(n_resamples),
+                "block_size": block,
+                "workers": 1,
+            }
+
+    return results
+
+
+def _adjust_pvalues(pvalues: np.ndarray, method: str) -> np.ndarray:
+    m = pvalues.size
+    if method == "none" or m == 0:
+        return pvalues
+    if method == "bonferroni":
+        return np.minimum(1.0, pvalues * m)
+    order = np.argsort(pvalues)
+    ranked = pvalues[order]
+    if method == "holm":
+        adjusted = np.maximum.accumulate(ranked * (m - np.arange(m)))
+    else:  # Benjamini-Hochberg
+        adjusted = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+    out = np.empty(m)
+    out[order] = np.minimum(1.0, adjusted)
+    return out
+
+
+def _bootstrap_share(x: np.ndarray, y: np.ndarray, n_resamples: int, block: int, stream) -> np.ndarray:
+    # One worker's share of bootstrap mean differences, drawn from its own stream.
+    rng = np.random.default_rng(stream)
+    values = []
+    for size in _block_sizes(n_resamples, block):
+        idx_x = rng.integers(0, x.size, size=(size, x.size))
+        idx_y = rng.integers(0, y.size, size=(size, y.size))
+        values.append(np.mean(x[idx_x], axis=1) - np.mean(y[idx_y], axis=1))
+    return np.concatenate(values)
+
+
+def _bootstrap_ci_mean_diff(
+    x: np.ndarray, y: np.ndarray, confidence_level: float, n_resamples: int, seed: int, workers: int = 1
+) -> List[float]:
+    if workers > 1:
+        streams = _spawn_streams(seed, workers)[1]
+        block = _permutation_block_size(x.size + y.size, n_resamples)
+        shares = _split_count(n_resamples, workers)
+        distribution = np.concatenate(
+            _run_shares(
+                _bootstrap_share,
+                [(x, y, share, block, stream) for share, stream in zip(shares, streams) if share > 0],
+                workers,
+            )
+        )
+        tail = (1 - confidence_level) / 2
+        low, high = np.percentile(distribution, [100 * tail, 100 * (1 - tail)])
+        return [float(low), float(high)]
 
-def _bootstrap_ci_mean_diff(x: np.ndarray, y: np.ndarray, confidence_level: float, n_resamples: int, seed: int) -> List[float]:
     rng = np.random.default_rng(seed)
 
     def stat(a, b, axis=-1):
@@ -83,6 +513,298 @@ def _bootstrap_ci_mean_diff(x: np.ndarray, y: np.ndarray, confidence_level: floa
     return [float(res.confidence_interval.low), float(res.confidence_interval.high)]
 
 
+def _resampling_options(data: Dict[str, Any]) -> Dict[str, Any]:
+    alternative = str(data.get("alternative", "two-sided")).strip().lower()
+    if alternative not in ("two-sided", "greater", "less"):
+        alternative = "two-sided"
+
+    permutations = int(data.get("permutations", 5000))
+    permutations = max(200, min(200000, permutations))
+    alpha = float(data.get("alpha", 0.05))
+    alpha = min(0.25, max(1e-5, alpha))
+    seed = int(data.get("seed", 42))
+    block_size = data.get("block_size")
+    if block_size is not None:
+        block_size = max(1, min(permutations, int(block_size)))
+    permutation_method = str(data.get("permutation_method", "auto")).strip().lower()
+    if permutation_method not in ("auto", "monte_carlo"):
+        permutation_method = "auto"
+    sequential = as_bool(data.get("sequential", False))
+    sequential_error = float(data.get("sequential_error", SEQUENTIAL_ERROR))
+    sequential_error = min(0.1, max(1e-6, sequential_error))
+    workers = int(data.get("workers", 1))
+    workers = max(1, min(MAX_WORKERS, workers))
+    return {
+        "alternative": alternative,
+        "permutations": permutations,
+        "alpha": alpha,
+        "seed": seed,
+        "block_size": block_size,
+        "permutation_method": permutation_method,
+        "sequential": sequential,
+        "sequential_error": sequential_error,
+        "workers": workers,
+    }
+
+
+def _comparison_results(x: np.ndarray, y: np.ndarray, perm: Dict[str, Any], opts: Dict[str, Any]) -> Dict[str, Any]:
+    alternative, alpha = opts["alternative"], opts["alpha"]
+
+    # Reference parametric tests.
+    welch = stats.ttest_ind(x, y, equal_var=False, alternative=alternative)
+    student = stats.ttest_ind(x, y, equal_var=True, alternative=alternative)
+
+    diff = float(np.mean(x) - np.mean(y))
+    d = _cohen_d(x, y)
+    ci = _bootstrap_ci_mean_diff(
+        x, y, confidence_level=1 - alpha, n_resamples=min(10000, opts["permutations"]), seed=opts["seed"],
+        workers=opts["workers"],
+    )
+    power = _t_power_two_sample(alpha=alpha, n1=x.size, n2=y.size, effect_size_d=d, alternative=alternative)
+
+    return {
+        "mean_diff": diff,
+        "effect_size_cohen_d": d,
+        "bootstrap_ci_mean_diff": ci,
+        "permutation_test": {
+            "statistic": perm["statistic"],
+            "p_value": perm["p_value"],
+            "method": perm["method"],
+            "exact": perm["exact"],
+            "n_resamples": perm["n_resamples"],
+            "workers": perm["workers"],
+            **({"sequential": perm["sequential"]} if "sequential" in perm else {}),
+        },
+        "welch_t": {
+            "statistic": float(welch.statistic),
+            "p_value": float(welch.pvalue),
+        },
+        "student_t": {
+            "statistic": float(student.statistic),
+            "p_value": float(student.pvalue),
+        },
+        "power_estimate": {
+            "method": "noncentral-t approximation",
+            "value": power,
+        },
+    }
+
+
+def handle_comparison(data: Dict[str, Any]) -> Dict[str, Any]:
+    parse_start = time.perf_counter()
+    x = _parse_array("group_a", data)
+    y = _parse_array("group_b", data)
+    parse_ms = (time.perf_counter() - parse_start) * 1000
+    opts = _resampling_options(data)
+
+    # Primary resampling test (difference in means).
+    perm = _permutation_test_mean_diff(
+        x, y, opts["alternative"], opts["permutations"], opts["seed"], opts["block_size"],
+        opts["permutation_method"], sequential=opts["sequential"], alpha=opts["alpha"],
+        sequential_error=opts["sequential_error"], workers=opts["workers"],
+    )
+
+    return {
+        "ok": True,
+        "input": {
+            "n_group_a": int(x.size),
+            "n_group_b": int(y.size),
+            "alternative": opts["alternative"],
+            "alpha": opts["alpha"],
+            "permutations": opts["permutations"],
+            "seed": opts["seed"],
+            "block_size": perm["block_size"],
+            "permutation_method": opts["permutation_method"],
+            "sequential": opts["sequential"],
+            "workers": opts["workers"],
+            "parse_ms": parse_ms,
+        },
+        "results": _comparison_results(x, y, perm, opts),
+    }
+
+
+def _batch_pairs(data: Dict[str, Any]) -> List[Tuple[str, str, str, np.ndarray, np.ndarray]]:
+    # Either explicit comparisons, or named columns plus the pairs to compare
+    # (all pairs of columns when `pairs` is omitted).
+    comparisons = data.get("comparisons")
+    if comparisons is not None:
+        if not isinstance(comparisons, list):
+            raise ValueError("'comparisons' must be an array of {group_a, group_b} objects.")
+        pairs = []
+        for i, item in enumerate(comparisons):
+            if not isinstance(item, dict):
+                raise ValueError(f"comparisons[{i}] must be an object with 'group_a' and 'group_b'.")
+            label = str(item.get("label", f"comparison_{i + 1}"))
+            pairs.append((label, "group_a", "group_b", _parse_array("group_a", item), _parse_array("group_b", item)))
+        return pairs
+
+    columns = data.get("columns")
+    if not isinstance(columns, dict) or not columns:
+        raise ValueError("Batch requests need 'comparisons' or 'columns'.")
+    requested = data.get("pairs")
+    if requested is None:
+        requested = list(itertools.combinations(columns.keys(), 2))
+    if not isinstance(requested, list):
+        raise ValueError("'pairs' must be an array of [column_a, column_b] pairs.")
+
+    parsed: Dict[str, np.ndarray] = {}
+    pairs = []
+    for i, pair in enumerate(requested):
+        if not isinstance(pair, (list, tuple)) or len(pair) != 2 or not all(isinstance(name, str) for name in pair):
+            raise ValueError(f"pairs[{i}] must be [column_a, column_b], two column names; got {pair!r}.")
+        for name in pair:
+            if name not in columns:
+                raise ValueError(f"Unknown column in 'pairs': {name}")
+            if name not in parsed:
+                parsed[name] = _parse_array(name, columns)
+        pairs.append((f"{pair[0]} vs {pair[1]}", pair[0], pair[1], parsed[pair[0]], parsed[pair[1]]))
+    return pairs
+
+
+def handle_batch(data: Dict[str, Any]) -> Dict[str, Any]:
+    parse_start = time.perf_counter()
+    pairs = _batch_pairs(data)
+    parse_ms = (time.perf_counter() - parse_start) * 1000
+    if not pairs:
+        raise ValueError("Batch request contains no comparisons.")
+    if len(pairs) > MAX_BATCH_COMPARISONS:
+        raise ValueError(f"At most {MAX_BATCH_COMPARISONS} comparisons per batch request.")
+    opts = _resampling_options(data)
+    correction = str(data.get("correction", "holm")).strip().lower()
+    if correction not in P_ADJUST_METHODS:
+        correction = "holm"
+
+    perms = _permutation_test_mean_diff_many(
+        [(x, y) for _, _, _, x, y in pairs], opts["alternative"], opts["permutations"], opts["seed"],
+        opts["block_size"], opts["permutation_method"],
+    )
+    adjusted = _adjust_pvalues(np.array([p["p_value"] for p in perms]), correction)
+
+    comparisons = []
+    for (label, name_a, name_b, x, y), perm, p_adj in zip(pairs, perms, adjusted):
+        results = _comparison_results(x, y, perm, opts)
+        results["permutation_test"]["p_value_adjusted"] = float(p_adj)
+        comparisons.append({
+            "label": label,
+            "group_a": name_a,
+            "group_b": name_b,
+            "n_group_a": int(x.size),
+            "n_group_b": int(y.size),
+            **results,
+        })
+
+    return {
+        "ok": True,
+        "operation": "batch",
+        "input": {
+            "n_comparisons": len(pairs),
+            "alternative": opts["alternative"],
+            "alpha": opts["alpha"],
+            "permutations": opts["permutations"],
+            "seed": opts["seed"],
+            "permutation_method": opts["permutation_method"],
+            "correction": correction,
+            "parse_ms": parse_ms,
+        },
+        "results": {
+            "comparisons": comparisons,
+            "shared_permutation_sets": len({(x.size, y.size) for _, _, _, x, y in pairs}),
+        },
+    }
+
+
+def handle_session_chunk(data: Dict[str, Any]) -> Dict[str, Any]:
+    parse_start = time.perf_counter()
+    chunk = {name: _finite_column(name, data) for name in ("group_a", "group_b") if name in data}
+    parse_ms = (time.perf_counter() - parse_start) * 1000
+
+    session_id, session = open_session(
+        "permutation_engine", data.get("session_id"), data, create=True, streams=("group_a", "group_b"),
+    )
+    with session["lock"]:
+        for name, values in chunk.items():
+            accumulate(session["streams"][name], values, session["rng"])
+        session["chunks"] += 1
+        summary = {name: accumulator_summary(acc) for name, acc in session["streams"].items()}
+        chunks = session["chunks"]
+
+    return {
+        "ok": True,
+        "operation": "session_chunk",
+        "session_id": session_id,
+        "input": {name: int(values.size) for name, values in chunk.items()},
+        "results": {"chunks": chunks, "parse_ms": parse_ms, **summary},
+    }
+
+
+def handle_session_result(data: Dict[str, Any]) -> Dict[str, Any]:
+    session_id, session = open_session(
+        "permutation_engine", data.get("session_id"), data, create=False, streams=("group_a", "group_b"),
+    )
+    with session["lock"]:
+        a, b = session["streams"]["group_a"], session["streams"]["group_b"]
+        if a["n"] < 2 or b["n"] < 2:
+            raise ValueError("Each group needs at least 2 numeric values before results can be computed.")
+        summary = {"group_a": accumulator_summary(a), "group_b": accumulator_summary(b)}
+        sample_a, sample_b = reservoir_sample(a).copy(), reservoir_sample(b).copy()
+    if as_bool(data.get("close", True)):
+        close_session(session_id)
+
+    opts = _resampling_options(data)
+    alternative, alpha = opts["alternative"], opts["alpha"]
+    n1, n2 = summary["group_a"]["n"], summary["group_b"]["n"]
+    m1, m2 = summary["group_a"]["mean"], summary["group_b"]["mean"]
+    sd1, sd2 = summary["group_a"]["sd"], summary["group_b"]["sd"]
+
+    # Parametric results straight from the sufficient statistics.
+    welch = stats.ttest_ind_from_stats(m1, sd1, n1, m2, sd2, n2, equal_var=False, alternative=alternative)
+    student = stats.ttest_ind_from_stats(m1, sd1, n1, m2, sd2, n2, equal_var=True, alternative=alternative)
+    pooled = (a["m2"] + b["m2"]) / max(1, n1 + n2 - 2)
+    d = float((m1 - m2) / math.sqrt(pooled)) if pooled > 0 else 0.0
+    power = _t_power_two_sample(alpha=alpha, n1=n1, n2=n2, effect_size_d=d, alternative=alternative)
+
+    results = {
+        "mean_diff": float(m1 - m2),
+        "effect_size_cohen_d": d,
+        "welch_t": {"statistic": float(welch.statistic), "p_value": float(welch.pvalue)},
+        "student_t": {"statistic": float(student.statistic), "p_value": float(student.pvalue)},
+        "power_estimate": {"method": "noncentral-t approximation", "value": power},
+        **summary,
+    }
+
+    # Resampling runs on the reservoir samples, not the full columns.
+    if sample_a.size >= 2 and sample_b.size >= 2:
+        perm = _permutation_test_mean_diff(
+            sample_a, sample_b, alternative, opts["permutations"], opts["seed"], opts["block_size"],
+            opts["permutation_method"], workers=opts["workers"],
+        )
+        results["reservoir_permutation_test"] = {
+            "statistic": perm["statistic"],
+            "p_value": perm["p_value"],
+            "method": perm["method"],
+            "n_resamples": perm["n_resamples"],
+        }
+        results["reservoir_bootstrap_ci_mean_diff"] = _bootstrap_ci_mean_diff(
+            sample_a, sample_b, confidence_level=1 - alpha, n_resamples=min(10000, opts["permutations"]),
+            seed=opts["seed"], workers=opts["workers"],
+        )
+
+    return {
+        "ok": True,
+        "operation": "session_result",
+        "session_id": session_id,
+        "input": {
+            "n_group_a": n1,
+            "n_group_b": n2,
+            "alternative": alternative,
+            "alpha": alpha,
+            "permutations": opts["permutations"],
+            "seed": opts["seed"],
+        },
+        "results": results,
+    }
+
+
 def permutation_engine(request):
     if request.method == "OPTIONS":
         return _response({"ok": True}, 204)
@@ -92,73 +814,21 @@ def permutation_engine(request):
 
     try:
         data = request.get_json(silent=True) or {}
-        x = _parse_array("group_a", data)
-        y = _parse_array("group_b", data)
-
-        alternative = str(data.get("alternative", "two-sided")).strip().lower()
-        if alternative not in ("two-sided", "greater", "less"):
-            alternative = "two-sided"
-
-        permutations = int(data.get("permutations", 5000))
-        permutations = max(200, min(200000, permutations))
-        alpha = float(data.get("alpha", 0.05))
-        alpha = min(0.25, max(1e-5, alpha))
-        seed = int(data.get("seed", 42))
-
-        # Primary resampling test (difference in means).
-        perm = stats.permutation_test(
-            data=(x, y),
-            statistic=lambda a, b, axis=-1: np.mean(a, axis=axis) - np.mean(b, axis=axis),
-            permutation_type="independent",
-            alternative=alternative,
-            n_resamples=permutations,
-            random_state=seed,
-            vectorized=False,
-        )
+        operation = str(data.get("operation", "compare")).strip().lower()
 
-        # Reference parametric tests.
-        welch = stats.ttest_ind(x, y, equal_var=False, alternative=alternative)
-        student = stats.ttest_ind(x, y, equal_var=True, alternative=alternative)
-
-        diff = float(np.mean(x) - np.mean(y))
-        d = _cohen_d(x, y)
-        ci = _bootstrap_ci_mean_diff(x, y, confidence_level=1 - alpha, n_resamples=min(10000, permutations), seed=seed)
-        power = _t_power_two_sample(alpha=alpha, n1=x.size, n2=y.size, effect_size_d=d, alternative=alternative)
-
-        return _response(
-            {
-                "ok": True,
-                "input": {
-                    "n_group_a": int(x.size),
-                    "n_group_b": int(y.size),
-                    "alternative": alternative,
-                    "alpha": alpha,
-                    "permutations": permutations,
-                    "seed": seed,
-                },
-                "results": {
-                    "mean_diff": diff,
-                    "effect_size_cohen_d": d,
-                    "bootstrap_ci_mean_diff": ci,
-                    "permutation_test": {
-                        "statistic": float(perm.statistic),
-                        "p_value": float(perm.pvalue),
-                    },
-                    "welch_t": {
-                        "statistic": float(welch.statistic),
-                        "p_value": float(welch.pvalue),
-                    },
-                    "student_t": {
-                        "statistic": float(student.statistic),
-                        "p_value": float(student.pvalue),
-                    },
-                    "power_estimate": {
-                        "method": "noncentral-t approximation",
-                        "value": power,
-                    },
-                },
-            },
-            200,
-        )
+        if operation == "compare":
+            return _response(handle_comparison(data), 200)
+
+        elif operation == "batch":
+            return _response(handle_batch(data), 200)
+
+        elif operation == "session_chunk":
+            return _response(handle_session_chunk(data), 200)
+
+        elif operation == "session_result":
+            return _response(handle_session_result(data), 200)
+
+        else:
+            return _response({"ok": False, "error": f"Unknown operation: {operation}"}, 400)
     except Exception as exc:
         return _response({"ok": False, "error": str(exc)}, 400)
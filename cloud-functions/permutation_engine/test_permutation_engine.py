@@ -0,0 +1,290 @@
+"""
+permutation_engine: p-values against SciPy and brute-force enumeration
+"""
+
+import base64
+import itertools
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from conftest import Request, load_function
+from statistico_core import reservoir_sample, sessions
+
+main = load_function("permutation_engine")
+
+ALTERNATIVES = ("two-sided", "less", "greater")
+
+
+def call(body):
+    return main.permutation_engine(Request(body))[0]
+
+
+def mean_diff(a, b, axis=-1):
+    return np.mean(a, axis=axis) - np.mean(b, axis=axis)
+
+
+def enumerated_pvalue(x, y, statistic, alternative):
+    """Permutation p-value over every split of the pooled sample"""
+    pooled = np.concatenate([x, y])
+    observed = statistic(x, y)
+    values = []
+    for chosen in itertools.combinations(range(pooled.size), x.size):
+        mask = np.zeros(pooled.size, dtype=bool)
+        mask[list(chosen)] = True
+        values.append(statistic(pooled[mask], pooled[~mask]))
+    values = np.array(values)
+    tol = 1e-9 * max(1.0, abs(observed))
+    p_less = np.mean(values <= observed + tol)
+    p_greater = np.mean(values >= observed - tol)
+    if alternative == "less":
+        return p_less
+    if alternative == "greater":
+        return p_greater
+    return min(1.0, 2 * min(p_less, p_greater))
+
+
+@pytest.mark.parametrize("alternative", ALTERNATIVES)
+@pytest.mark.parametrize("block_size", [None, 7])
+def test_monte_carlo_matches_scipy_for_a_seed(alternative, block_size):
+    rng = np.random.default_rng(1)
+    x, y = rng.normal(0.4, 1, 15), rng.normal(0, 1, 18)
+    body = {"group_a": x.tolist(), "group_b": y.tolist(), "alternative": alternative, "permutations": 999, "seed": 7,
+            "permutation_method": "monte_carlo"}
+    if block_size:
+        body["block_size"] = block_size
+    perm = call(body)["results"]["permutation_test"]
+    expected = stats.permutation_test((x, y), mean_diff, n_resamples=999, alternative=alternative,
+                                      random_state=7, vectorized=True)
+    assert perm["exact"] is False
+    assert perm["statistic"] == pytest.approx(expected.statistic, rel=1e-12)
+    assert perm["p_value"] == expected.pvalue
+
+
+@pytest.mark.parametrize("alternative", ALTERNATIVES)
+def test_small_samples_are_enumerated_like_scipy(alternative):
+    x, y = np.array([1.2, 3.4, 2.2, 5.1]), np.array([0.3, 1.1, 2.0, 0.5, 1.7])
+    body = {"group_a": x.tolist(), "group_b": y.tolist(), "alternative": alternative, "permutations": 200,
+            "permutation_method": "monte_carlo"}
+    perm = call(body)["results"]["permutation_test"]
+    expected = stats.permutation_test((x, y), mean_diff, n_resamples=200, alternative=alternative, vectorized=True)
+    assert perm["exact"] is True
+    assert perm["n_resamples"] == 126
+    assert perm["p_value"] == pytest.approx(expected.pvalue, abs=1e-12)
+
+
+@pytest.mark.parametrize("alternative", ALTERNATIVES)
+@pytest.mark.parametrize("x, y", [
+    ([1.2, 3.4, 2.2, 5.1], [0.3, 1.1, 2.0, 0.5, 1.7]),
+    ([3, 3, 1, 4, 4, 2], [1, 2, 2, 0, 3, 1, 1]),
+    ([0.05, -0.25, 1.5], [0.75, 0.5, 0.5, -1.0, 2.25, 0.0]),
+])
+def test_exact_subset_sum_matches_enumeration(x, y, alternative):
+    x, y = np.array(x, dtype=float), np.array(y, dtype=float)
+    perm = call({"group_a": x.tolist(), "group_b": y.tolist(), "alternative": alternative})["results"]["permutation_test"]
+    assert perm["method"] == "exact_subset_sum"
+    assert perm["n_resamples"] == len(list(itertools.combinations(range(x.size + y.size), x.size)))
+    assert perm["p_value"] == pytest.approx(enumerated_pvalue(x, y, mean_diff, alternative), abs=1e-12)
+
+
+@pytest.mark.parametrize("alternative", ALTERNATIVES)
+def test_off_lattice_data_is_enumerated(alternative):
+    x, y = np.array([0.31415926, 1.2, 2.7182818]), np.array([0.5, 1.41421356, 3.3, 0.1])
+    perm = call({"group_a": x.tolist(), "group_b": y.tolist(), "alternative": alternative})["results"]["permutation_test"]
+    assert perm["method"] == "exact_enumeration"
+    assert perm["p_value"] == pytest.approx(enumerated_pvalue(x, y, mean_diff, alternative), abs=1e-12)
+
+
+@pytest.mark.parametrize("alternative", ALTERNATIVES)
+@pytest.mark.parametrize("x, y", [
+    ([1e-7, 2e-7, 3e-7], [5e-7, 6e-7, 7e-7]),  # smaller than any fixed lattice tolerance
+    ([1.0, 2.0, 3.0000001, 4.0], [3.0, 5.0, 6.0, 2.0]),  # a near-tie that is not a tie
+])
+def test_small_scale_and_near_tied_data_match_scipy(x, y, alternative):
+    x, y = np.array(x), np.array(y)
+    perm = call({"group_a": x.tolist(), "group_b": y.tolist(), "alternative": alternative})["results"]["permutation_test"]
+    expected = stats.permutation_test((x, y), mean_diff, n_resamples=np.inf, alternative=alternative, vectorized=True)
+    assert perm["method"] == "exact_enumeration"
+    assert perm["p_value"] == pytest.approx(expected.pvalue, abs=1e-12)
+
+
+@pytest.fixture
+def shifted_groups():
+    rng = np.random.default_rng(4)
+    x, y = rng.normal(0, 1, 20), rng.normal(0, 1, 20)
+
+    def body(shift, **options):
+        return {"group_a": (x + shift).tolist(), "group_b": y.tolist(), "seed": 3,
+                "permutation_method": "monte_carlo", **options}
+    return body
+
+
+@pytest.mark.parametrize("shift, decision, used", [
+    (0.7, "reject", 400),
+    (0.4, "fail_to_reject", 1600),
+    (0.5, "undecided", 2000),
+])
+def test_sequential_stop_uses_a_prefix_of_the_seeded_stream(shifted_groups, shift, decision, used):
+    body = shifted_groups(shift, permutations=2000, sequential=True, alpha=0.05)
+    perm = call(body)["results"]["permutation_test"]
+    assert perm["sequential"]["decision"] == decision
+    assert perm["n_resamples"] == used
+    assert perm["sequential"]["stopped_early"] == (used < 2000)
+    if decision != "undecided":
+        assert (perm["p_value"] < 0.05) == (decision == "reject")
+    fixed = call(shifted_groups(shift, permutations=used))["results"]["permutation_test"]
+    assert perm["p_value"] == fixed["p_value"]
+
+
+def test_sequential_is_ignored_when_every_split_is_enumerated():
+    body = {"group_a": [1.5, 2.5, 3.5], "group_b": [0.5, 1.0, 2.0], "sequential": True}
+    perm = call(body)["results"]["permutation_test"]
+    assert perm["exact"] is True
+    assert "sequential" not in perm
+
+
+@pytest.fixture
+def cores(monkeypatch):
+    """Pretend the instance has `n` cores, so workers > 1 uses the process pool"""
+    def set_cores(n):
+        monkeypatch.setattr(main.os, "cpu_count", lambda: n)
+    yield set_cores
+    if main._POOL is not None:
+        main._POOL.shutdown(wait=True)
+        main._POOL = None
+
+
+@pytest.mark.parametrize("workers", [2, 3, 5])
+def test_parallel_results_do_not_depend_on_the_pool(cores, workers):
+    rng = np.random.default_rng(6)
+    body = {"group_a": rng.normal(0.3, 1, 40).tolist(), "group_b": rng.normal(0, 1, 35).tolist(),
+            "permutations": 3000, "seed": 11, "workers": workers}
+    cores(1)
+    in_process = call(body)["results"]
+    cores(4)
+    pooled = call(body)["results"]
+    assert main._POOL is not None
+    assert pooled == in_process
+    assert pooled["permutation_test"]["workers"] == workers
+
+
+def test_failed_pool_is_shut_down_and_shares_run_in_process(cores):
+    class BrokenPool:
+        shutdown_args = None
+
+        def submit(self, *args):
+            raise main.BrokenProcessPool("worker died")
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            self.shutdown_args = (wait, cancel_futures)
+
+    pool = BrokenPool()
+    cores(4)
+    main._POOL, main._POOL_SIZE = pool, 8
+    assert main._run_shares(pow, [(2, 3), (3, 2)], 2) == [8, 9]
+    assert pool.shutdown_args == (False, True)
+    assert main._POOL is None
+
+
+@pytest.mark.parametrize("method", ["auto", "monte_carlo"])
+def test_batch_comparison_equals_the_single_pair_request(method):
+    rng = np.random.default_rng(9)
+    columns = {"a": rng.normal(0, 1, 20), "b": rng.normal(0.5, 1, 20), "c": rng.normal(0.2, 1, 20),
+               "d": rng.normal(1, 1, 25).round(1)}
+    pairs = [["a", "b"], ["a", "c"], ["b", "d"], ["c", "d"]]
+    options = {"permutations": 2000, "seed": 5, "permutation_method": method}
+    body = {"operation": "batch", "columns": {k: v.tolist() for k, v in columns.items()}, "pairs": pairs,
+            "correction": "bonferroni", **options}
+    comparisons = call(body)["results"]["comparisons"]
+    for pair, comparison in zip(pairs, comparisons):
+        single = call({"group_a": columns[pair[0]].tolist(), "group_b": columns[pair[1]].tolist(), **options})
+        adjusted = comparison["permutation_test"].pop("p_value_adjusted")
+        assert comparison["label"] == f"{pair[0]} vs {pair[1]}"
+        assert {k: comparison[k] for k in single["results"]} == single["results"]
+        assert adjusted == min(1.0, 4 * single["results"]["permutation_test"]["p_value"])
+
+
+@pytest.mark.parametrize("pairs", [[["c0", ["x"]]], [["c0"]], ["c0c1"], [["c0", 1]]])
+def test_batch_rejects_malformed_pairs(pairs):
+    body = {"operation": "batch", "columns": {"c0": [1, 2, 3], "c1": [2, 3, 4]}, "pairs": pairs}
+    result = call(body)
+    assert result["ok"] is False
+    assert result["error"].startswith("pairs[0] must be [column_a, column_b]")
+
+
+def base64_column(values, dtype="float64"):
+    data = np.asarray(values, dtype="<f8" if dtype == "float64" else "<f4").tobytes()
+    return {"encoding": "base64", "dtype": dtype, "data": base64.b64encode(data).decode()}
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_base64_columns_give_the_json_result(dtype):
+    x, y = [1.25, 2.5, 0.75, 3.0, 2.25, np.nan], [0.5, 1.0, 1.5, 0.25, 2.0]
+    json_body = {"group_a": [v for v in x if v == v], "group_b": y}
+    binary_body = {"group_a": base64_column(x, dtype), "group_b": base64_column(y, dtype)}
+    expected = call(json_body)
+    result = call(binary_body)
+    assert result["input"]["n_group_a"] == 5
+    assert result["results"] == expected["results"]
+
+
+def test_json_columns_drop_text_and_missing_cells():
+    x = [1.25, "n/a", 2.5, None, 0.75, 3.0, "", 2.25, "Infinity"]
+    result = call({"group_a": x, "group_b": [0.5, 1.0, 1.5, 0.25, 2.0]})
+    assert result["input"]["n_group_a"] == 5
+    assert result["results"]["mean_diff"] == pytest.approx(np.mean([1.25, 2.5, 0.75, 3.0, 2.25]) - 1.05)
+
+
+@pytest.mark.parametrize("column, message", [
+    ({"encoding": "base64", "data": "not base64!"}, "'group_a' does not contain valid base64 data."),
+    ({"encoding": "base64", "data": "AAAA"}, "'group_a': byte length is not a multiple of 8."),
+    ({"encoding": "base64", "dtype": "int32", "data": ""}, "'group_a': dtype must be one of"),
+    ({"encoding": "hex", "data": "00"}, "'group_a': unsupported encoding 'hex' (use base64)."),
+    ("1, 2, 3", "'group_a' must be an array of numbers."),
+])
+def test_malformed_columns_are_rejected(column, message):
+    result = call({"group_a": column, "group_b": [0.5, 1.0, 1.5]})
+    assert result["ok"] is False
+    assert result["error"].startswith(message)
+
+
+def test_chunked_session_equals_the_one_shot_request():
+    rng = np.random.default_rng(10)
+    x, y = rng.normal(10, 2, 60), rng.normal(9, 3, 45)
+    chunks = [{"group_a": x[:7].tolist(), "group_b": y[:20].tolist()}, {"group_a": x[7:41].tolist()},
+              {"group_a": x[41:].tolist(), "group_b": y[20:].tolist()}]
+    session_id = None
+    for chunk in chunks:
+        response = call({"operation": "session_chunk", **chunk, **({"session_id": session_id} if session_id else {})})
+        session_id = response["session_id"]
+    assert response["results"]["chunks"] == 3
+    options = {"permutations": 2000, "seed": 5, "permutation_method": "monte_carlo"}
+    results = call({"operation": "session_result", "session_id": session_id, **options})["results"]
+    expected = call({"group_a": x.tolist(), "group_b": y.tolist(), **options})["results"]
+
+    # Chan's merge gives the one-pass moments; columns within the reservoir are kept whole and in order.
+    assert results["group_a"]["mean"] == pytest.approx(x.mean(), rel=1e-12)
+    assert results["group_b"]["sd"] == pytest.approx(y.std(ddof=1), rel=1e-12)
+    for key in ("mean_diff", "effect_size_cohen_d"):
+        assert results[key] == pytest.approx(expected[key], rel=1e-12)
+    for test in ("welch_t", "student_t"):
+        assert results[test] == pytest.approx(expected[test], rel=1e-10)
+    assert results["reservoir_permutation_test"]["p_value"] == expected["permutation_test"]["p_value"]
+    assert results["reservoir_bootstrap_ci_mean_diff"] == expected["bootstrap_ci_mean_diff"]
+
+    closed = call({"operation": "session_result", "session_id": session_id})
+    assert closed["ok"] is False
+    assert closed["error"] == f"Unknown or expired session: {session_id}"
+
+
+def test_session_reservoir_is_a_bounded_sample_of_the_stream():
+    values = np.arange(1000, dtype=float)
+    response = call({"operation": "session_chunk", "group_a": values[:300].tolist(), "reservoir_size": 50})
+    call({"operation": "session_chunk", "session_id": response["session_id"], "group_a": values[300:].tolist()})
+    acc = sessions._SESSIONS[response["session_id"]]["streams"]["group_a"]
+    sample = reservoir_sample(acc)
+    assert sample.size == 50
+    assert np.unique(sample).size == 50
+    assert np.isin(sample, values).all()
+    assert sample.max() >= 300  # later chunks replace earlier values
@@ -0,0 +1,56 @@
+"""
+rm_anova_power: power curves and required sample sizes against scipy.stats and a linear search
+"""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from conftest import Request, load_function
+
+main = load_function("rm_anova_power")
+
+
+def call(body):
+    return main.rm_anova_power(Request(body))[0]
+
+
+def power(n, f, k, alpha):
+    """Power of the RM-ANOVA F test straight from scipy.stats.ncf"""
+    df_error = (n - 1) * (k - 1)
+    return stats.ncf.sf(stats.f.isf(alpha, k - 1, df_error), k - 1, df_error, n * f * f * (k - 1))
+
+
+def smallest_n(f, k, alpha, target):
+    n = 2
+    while power(n, f, k, alpha) < target:
+        n += 1
+    return n
+
+
+def test_curve_matches_noncentral_f():
+    body = {"mode": "curve", "k": 4, "effect_sizes_f": [0.15, 0.4], "alphas": [0.05, 0.01],
+            "target_powers": [0.8, 0.95], "n_values": [2, 5, 10, 40, 120]}
+    results = call(body)["results"]
+    assert results["n_values"] == [2, 5, 10, 40, 120]
+    for curve in results["curves"]:
+        expected = [power(n, curve["effect_size_cohen_f"], 4, curve["alpha"]) for n in results["n_values"]]
+        assert curve["power"] == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+
+def test_required_sizes_are_the_smallest_reaching_the_target():
+    body = {"mode": "curve", "k": 3, "effect_sizes_f": [0.1, 0.25, 0.6], "alphas": [0.05, 0.01],
+            "target_powers": [0.8, 0.9]}
+    rows = call(body)["results"]["required_sample_sizes"]
+    assert len(rows) == 12
+    for row in rows:
+        f, alpha, target = row["effect_size_cohen_f"], row["alpha"], row["target_power"]
+        assert row["required_sample_size"] == smallest_n(f, 3, alpha, target)
+        assert row["achieved_power"] == pytest.approx(power(row["required_sample_size"], f, 3, alpha), rel=1e-9)
+
+
+def test_required_mode_beyond_the_old_ceiling_of_1000():
+    result = call({"mode": "required", "k": 3, "effect_size_f": 0.05, "target_power": 0.8})["results"]
+    n = result["required_sample_size"]
+    assert n > 1000
+    assert power(n, 0.05, 3, 0.05) >= 0.8 > power(n - 1, 0.05, 3, 0.05)
@@ -0,0 +1,68 @@
+"""
+Statistico Analytics shared statistics core
+
+Code shared by the cloud functions: response building, chunked sessions,
+deferred SciPy imports, request decoding and power analysis. Importing this
+package loads NumPy only; SciPy submodules are imported by the operations
+that use them, on first use.
+"""
+
+from .http import CORS_HEADERS, json_response
+from .input import BINARY_DTYPES, as_bool, decode_column
+from .lazy import LazyModule, lazy_import
+from .resampling import tail_pvalue
+from .sessions import (
+    DEFAULT_RESERVOIR_SIZE,
+    MAX_RESERVOIR_SIZE,
+    accumulate,
+    accumulator_summary,
+    close_session,
+    new_accumulator,
+    open_session,
+    reservoir_sample,
+)
+from .power import (
+    MAX_CURVE_POINTS,
+    MAX_SAMPLE_SIZE,
+    as_float_list,
+    cohen_f_from_partial_eta_squared,
+    interpret_power,
+    observed_power_rm_anova,
+    power_curve_rm_anova,
+    power_rm_anova,
+    required_sample_size_rm_anova,
+    required_sample_sizes_rm_anova,
+    rm_anova_power_analysis,
+    t_power,
+)
+
+__all__ = [
+    "BINARY_DTYPES",
+    "CORS_HEADERS",
+    "DEFAULT_RESERVOIR_SIZE",
+    "LazyModule",
+    "MAX_CURVE_POINTS",
+    "MAX_RESERVOIR_SIZE",
+    "MAX_SAMPLE_SIZE",
+    "accumulate",
+    "accumulator_summary",
+    "as_bool",
+    "as_float_list",
+    "close_session",
+    "cohen_f_from_partial_eta_squared",
+    "decode_column",
+    "interpret_power",
+    "json_response",
+    "lazy_import",
+    "new_accumulator",
+    "observed_power_rm_anova",
+    "open_session",
+    "power_curve_rm_anova",
+    "power_rm_anova",
+    "required_sample_size_rm_anova",
+    "required_sample_sizes_rm_anova",
+    "reservoir_sample",
+    "rm_anova_power_analysis",
+    "t_power",
+    "tail_pvalue",
+]
@@ -0,0 +1,20 @@
+"""
+HTTP response helpers shared by the cloud functions
+"""
+
+from typing import Any, Dict, Tuple
+
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization",
+    "Access-Control-Allow-Methods": "POST, OPTIONS",
+}
+
+
+def json_response(payload: Dict[str, Any], status: int = 200, engine_notice: str = "") -> Tuple[Dict[str, Any], int, Dict[str, str]]:
+    """Build JSON response with CORS headers"""
+    body = dict(payload or {})
+    if engine_notice:
+        body.setdefault("engine_notice", engine_notice)
+    return body, status, dict(CORS_HEADERS)
@@ -0,0 +1,65 @@
+"""
+Request decoding helpers shared by the cloud functions
+
+Numeric columns arrive as JSON arrays or as base64 binary columns
+({"encoding": "base64", "dtype": "float64", "data": "..."}); both decode to
+float64 arrays with NaN for missing or non-numeric entries.
+"""
+
+import base64
+import binascii
+from typing import Any
+
+import numpy as np
+
+# Binary column encodings accepted in place of JSON arrays (little-endian)
+BINARY_DTYPES = {
+    "float64": np.dtype("<f8"),
+    "<f8": np.dtype("<f8"),
+    "float32": np.dtype("<f4"),
+    "<f4": np.dtype("<f4"),
+}
+
+
+def decode_column(name: str, values: Any) -> np.ndarray:
+    """Decode a JSON array or base64 column to float64 (non-numbers become NaN)"""
+    # Binary columns hold little-endian values, viewed in place with np.frombuffer.
+    if isinstance(values, dict):
+        encoding = str(values.get("encoding", "base64")).strip().lower()
+        if encoding != "base64":
+            raise ValueError(f"'{name}': unsupported encoding '{encoding}' (use base64).")
+        dtype = BINARY_DTYPES.get(str(values.get("dtype", "float64")).strip().lower())
+        if dtype is None:
+            raise ValueError(f"'{name}': dtype must be one of {', '.join(sorted(BINARY_DTYPES))}.")
+        try:
+            raw = base64.b64decode(values.get("data", ""), validate=True)
+        except (binascii.Error, TypeError, ValueError):
+            raise ValueError(f"'{name}' does not contain valid base64 data.")
+        if len(raw) % dtype.itemsize:
+            raise ValueError(f"'{name}': byte length is not a multiple of {dtype.itemsize}.")
+        return np.frombuffer(raw, dtype=dtype).astype(float, copy=False)
+
+    if not isinstance(values, list):
+        raise ValueError(f"'{name}' must be an array of numbers.")
+    try:
+        arr = np.asarray(values, dtype=float)
+        if arr.ndim == 1:
+            return arr
+    except (TypeError, ValueError):
+        pass
+    # Mixed content (text cells etc.): convert element by element, dropping
+    # anything that is not a number.
+    arr = np.full(len(values), np.nan)
+    for i, v in enumerate(values):
+        try:
+            arr[i] = float(v)
+        except (TypeError, ValueError):
+            continue
+    return arr
+
+
+def as_bool(value: Any) -> bool:
+    """Truthy request flag (also the strings 1, true, yes and on)"""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
@@ -0,0 +1,44 @@
+"""
+Deferred module imports
+
+SciPy's stats package takes most of a cold start to import, and many
+requests never touch it. Modules are bound at import time as proxies and
+only imported when an attribute is first read, i.e. when the first
+operation that needs them runs.
+"""
+
+import importlib
+import threading
+from typing import Any
+
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._module is None:
+                self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        # Only called for names not found on the proxy itself
+        return getattr(self._module or self._load(), attr)
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Return a proxy for module `name` that imports it on first use"""
+    return LazyModule(name)
@@ -0,0 +1,327 @@
+"""
+Power analysis shared by the cloud functions
+
+Distribution functions come from scipy.special (the ufuncs behind
+scipy.stats.f, ncf, t and nct), so power requests never import scipy.stats.
+"""
+
+import math
+from typing import Any, Dict, List, Tuple
+import numpy as np
+
+from .lazy import lazy_import
+
+special = lazy_import("scipy.special")
+
+# Adaptive sample-size search ceiling and maximum points per power curve
+MAX_SAMPLE_SIZE = 10_000_000
+MAX_CURVE_POINTS = 500
+
+
+def cohen_f_from_partial_eta_squared(partial_eta_sq: float) -> float:
+    """Convert partial eta squared to Cohen's f"""
+    if partial_eta_sq <= 0 or partial_eta_sq >= 1:
+        return 0.0
+    return math.sqrt(partial_eta_sq / (1 - partial_eta_sq))
+
+
+def observed_power_rm_anova(
+    f_statistic: float,
+    df_between: int,
+    df_error: int,
+    alpha: float = 0.05
+) -> float:
+    """
+    Calculate observed power for repeated measures ANOVA
+    using non-central F distribution
+
+    Args:
+        f_statistic: Observed F statistic
+        df_between: Degrees of freedom for time/condition (numerator)
+        df_error: Degrees of freedom for error (denominator)
+        alpha: Significance level
+
+    Returns:
+        Observed power (0 to 1)
+    """
+    if f_statistic <= 0 or df_between <= 0 or df_error <= 0:
+        return 0.0
+
+    try:
+        # Critical F value at alpha level
+        f_crit = special.fdtri(df_between, df_error, 1 - alpha)
+
+        # Non-centrality parameter from observed F
+        # λ = F * df1
+        ncp = f_statistic * df_between
+
+        # Power = 1 - P(F_ncf < F_critical)
+        # where F_ncf follows non-central F distribution
+        power = 1 - special.ncfdtr(df_between, df_error, ncp, f_crit)
+
+        return float(max(0.0, min(1.0, power)))
+    except Exception:
+        return 0.0
+
+
+def power_rm_anova(n, effect_size_f, num_timepoints: int, alpha):
+    """
+    Vectorized power for repeated measures ANOVA
+
+    n, effect_size_f and alpha broadcast against each other, so a whole
+    grid is evaluated with a single fdtri / ncfdtr call each.
+
+    Returns:
+        Array of power values (0 to 1)
+    """
+    n = np.asarray(n, dtype=float)
+    df_between = num_timepoints - 1
+    df_error = (n - 1) * df_between
+    ncp = n * np.square(effect_size_f) * df_between
+    f_crit = special.fdtri(df_between, df_error, 1 - np.asarray(alpha, dtype=float))
+    power = 1 - special.ncfdtr(df_between, df_error, ncp, f_crit)
+    return np.clip(np.nan_to_num(power), 0.0, 1.0)
+
+
+def required_sample_sizes_rm_anova(effect_size_f, num_timepoints: int, target_power, alpha) -> np.ndarray:
+    """
+    Smallest n reaching each target power, for broadcastable arrays of
+    effect size, target power and alpha (all solved together)
+    """
+    f, target, alpha = np.broadcast_arrays(
+        np.asarray(effect_size_f, dtype=float),
+        np.asarray(target_power, dtype=float),
+        np.asarray(alpha, dtype=float),
+    )
+    valid = f > 0
+    # Invariant: power(lo) < target <= power(hi); n = 1 has no error df
+    lo = np.ones(f.shape)
+    hi = np.full(f.shape, 2.0)
+
+    # Adaptive bracketing: double the upper bound until it reaches the target
+    while True:
+        short = valid & (hi < MAX_SAMPLE_SIZE) & (power_rm_anova(hi, f, num_timepoints, alpha) < target)
+        if not short.any():
+            break
+        lo = np.where(short, hi, lo)
+        hi = np.where(short, np.minimum(hi * 2, MAX_SAMPLE_SIZE), hi)
+
+    # Integer bisection inside every bracket at once
+    while True:
+        active = valid & (hi - lo > 1)
+        if not active.any():
+            break
+        mid = np.floor((lo + hi) / 2)
+        reached = power_rm_anova(mid, f, num_timepoints, alpha) >= target
+        hi = np.where(active & reached, mid, hi)
+        lo = np.where(active & ~reached, mid, lo)
+
+    return np.where(valid, hi, 0).astype(int)
+
+
+def required_sample_size_rm_anova(
+    effect_size_f: float,
+    num_timepoints: int,
+    target_power: float = 0.80,
+    alpha: float = 0.05
+) -> int:
+    """
+    Calculate required sample size for target power in RM-ANOVA
+
+    Args:
+        effect_size_f: Cohen's f effect size
+        num_timepoints: Number of repeated measurements (k)
+        target_power: Desired power level
+        alpha: Significance level
+
+    Returns:
+        Smallest sample size (n subjects) whose power reaches the target
+    """
+    if effect_size_f <= 0 or num_timepoints < 2:
+        return 0
+    return int(required_sample_sizes_rm_anova(effect_size_f, num_timepoints, target_power, alpha))
+
+
+def as_float_list(data: Dict[str, Any], plural: str, singular: str, default: float) -> List[float]:
+    """Read a list parameter, falling back to its scalar form"""
+    values = data.get(plural, data.get(singular, default))
+    if not isinstance(values, list):
+        values = [values]
+    return [float(v) for v in values]
+
+
+def power_curve_rm_anova(data: Dict[str, Any], alpha: float, effect_size_f) -> Dict[str, Any]:
+    """Power curves over a grid of n x effect sizes x alphas, plus required n per target"""
+    k = int(data.get("k", 3))
+    if k < 2:
+        raise ValueError("Number of timepoints (k) must be at least 2")
+
+    if "effect_sizes_f" in data:
+        effect_sizes = as_float_list(data, "effect_sizes_f", "effect_size_f", 0.0)
+    elif isinstance(data.get("partial_eta_squared"), list):
+        effect_sizes = [cohen_f_from_partial_eta_squared(float(v)) for v in data["partial_eta_squared"]]
+    else:
+        effect_sizes = [effect_size_f] if effect_size_f else []
+    effect_sizes = [f for f in effect_sizes if f > 0]
+    if not effect_sizes:
+        raise ValueError("At least one positive effect size is required")
+
+    alphas = [max(0.001, min(0.25, a)) for a in as_float_list(data, "alphas", "alpha", alpha)]
+    targets = [max(0.50, min(0.99, p)) for p in as_float_list(data, "target_powers", "target_power", 0.80)]
+
+    f_grid = np.asarray(effect_sizes)[None, :, None]
+    alpha_grid = np.asarray(alphas)[:, None, None]
+    target_grid = np.asarray(targets)[None, None, :]
+    required = required_sample_sizes_rm_anova(f_grid, k, target_grid, alpha_grid)
+
+    if "n_values" in data:
+        n_values = sorted({int(v) for v in data["n_values"] if int(v) >= 2})
+    else:
+        n_min = max(2, int(data.get("n_min", 2)))
+        n_max = int(data.get("n_max", 0)) or int(required.max() * 1.25) + 1
+        n_values = np.unique(np.linspace(n_min, max(n_min, n_max), MAX_CURVE_POINTS).astype(int)).tolist()
+    if not n_values:
+        raise ValueError("Sample size grid is empty")
+    n_values = n_values[:MAX_CURVE_POINTS]
+
+    power = power_rm_anova(np.asarray(n_values)[None, None, :], f_grid, k, alpha_grid)
+    achieved = power_rm_anova(required, f_grid, k, alpha_grid)
+
+    curves = []
+    required_sizes = []
+    for i, a in enumerate(alphas):
+        for j, f in enumerate(effect_sizes):
+            curves.append({"alpha": a, "effect_size_cohen_f": f, "power": power[i, j].tolist()})
+            for t, target in enumerate(targets):
+                required_sizes.append({
+                    "alpha": a,
+                    "effect_size_cohen_f": f,
+                    "target_power": target,
+                    "required_sample_size": int(required[i, j, t]),
+                    "achieved_power": float(achieved[i, j, t])
+                })
+
+    return {
+        "num_timepoints": k,
+        "n_values": n_values,
+        "curves": curves,
+        "required_sample_sizes": required_sizes
+    }
+
+
+def rm_anova_power_analysis(data: Dict[str, Any]) -> Tuple[str, float, Dict[str, Any]]:
+    """
+    Run an RM-ANOVA power request ("observed", "required" or "curve" mode)
+
+    Returns:
+        (mode, alpha, results)
+    """
+    mode = str(data.get("mode", "observed")).strip().lower()
+    alpha = float(data.get("alpha", 0.05))
+    alpha = max(0.001, min(0.25, alpha))
+
+    # Extract effect size (Cohen's f)
+    effect_size_f = None
+    if "effect_size_f" in data:
+        effect_size_f = float(data["effect_size_f"])
+    elif "partial_eta_squared" in data and not isinstance(data["partial_eta_squared"], list):
+        partial_eta_sq = float(data["partial_eta_squared"])
+        effect_size_f = cohen_f_from_partial_eta_squared(partial_eta_sq)
+
+    results = {}
+
+    if mode == "observed":
+        # Calculate observed power from ANOVA results
+        f_stat = float(data.get("f_statistic", 0))
+        df_between = int(data.get("df_between", 0))
+        df_error = int(data.get("df_error", 0))
+        n = int(data.get("n", 0))
+        k = int(data.get("k", 0))
+
+        if f_stat <= 0 or df_between <= 0 or df_error <= 0:
+            raise ValueError("Invalid F statistic or degrees of freedom")
+
+        observed_power = observed_power_rm_anova(f_stat, df_between, df_error, alpha)
+
+        # If effect size not provided, calculate from F statistic
+        if effect_size_f is None and n > 0 and k > 0:
+            # Approximate Cohen's f from F statistic
+            # f = sqrt(F * df1 / n)
+            effect_size_f = math.sqrt(f_stat * df_between / n)
+
+        results = {
+            "observed_power": observed_power,
+            "effect_size_cohen_f": effect_size_f if effect_size_f else 0.0,
+            "f_statistic": f_stat,
+            "df_between": df_between,
+            "df_error": df_error,
+            "interpretation": interpret_power(observed_power)
+        }
+
+        # Also calculate required sample size for target power levels
+        # (both targets solved in one vectorized search)
+        if effect_size_f and effect_size_f > 0 and k > 1:
+            required_80, required_90 = required_sample_sizes_rm_anova(effect_size_f, k, [0.80, 0.90], alpha)
+            results["required_for_80pct"] = int(required_80)
+            results["required_for_90pct"] = int(required_90)
+
+    elif mode == "required":
+        # Calculate required sample size for target power
+        if effect_size_f is None or effect_size_f <= 0:
+            raise ValueError("Effect size (Cohen's f or partial eta squared) is required")
+
+        k = int(data.get("k", 3))
+        if k < 2:
+            raise ValueError("Number of timepoints (k) must be at least 2")
+
+        target_power = float(data.get("target_power", 0.80))
+        target_power = max(0.50, min(0.99, target_power))
+
+        required_n = required_sample_size_rm_anova(effect_size_f, k, target_power, alpha)
+
+        # Calculate achieved power with this n
+        achieved_power = power_rm_anova(required_n, effect_size_f, k, alpha)
+
+        results = {
+            "required_sample_size": required_n,
+            "achieved_power": float(achieved_power),
+            "effect_size_cohen_f": effect_size_f,
+            "target_power": target_power,
+            "num_timepoints": k,
+            "interpretation": f"You need {required_n} subjects to achieve {target_power*100:.0f}% power"
+        }
+
+    elif mode == "curve":
+        # Power curves over n x effect sizes x alphas from one grid evaluation
+        results = power_curve_rm_anova(data, alpha, effect_size_f)
+
+    else:
+        raise ValueError(f"Invalid mode: {mode}. Use 'observed', 'required' or 'curve'")
+
+    return mode, alpha, results
+
+
+def t_power(alpha: float, df: float, ncp: float, alternative: str) -> float:
+    """t-test power via the noncentral t distribution"""
+    tcrit = special.stdtrit(df, 1 - alpha / 2) if alternative == "two-sided" else special.stdtrit(df, 1 - alpha)
+    if alternative == "greater":
+        power = 1.0 - special.nctdtr(df, ncp, tcrit)
+    elif alternative == "less":
+        power = special.nctdtr(df, ncp, -tcrit)
+    else:
+        power = (1.0 - special.nctdtr(df, ncp, tcrit)) + special.nctdtr(df, ncp, -tcrit)
+    return float(max(0.0, min(1.0, power)))
+
+
+def interpret_power(power: float) -> str:
+    """Provide interpretation of power value"""
+    if power >= 0.90:
+        return "Excellent power - very likely to detect true effects"
+    elif power >= 0.80:
+        return "Good power - adequate for most research purposes"
+    elif power >= 0.60:
+        return "Moderate power - may miss some true effects"
+    elif power >= 0.40:
+        return "Low power - likely to miss true effects"
+    else:
+        return "Very low power - insufficient to detect effects reliably"
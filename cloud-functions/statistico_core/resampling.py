@@ -0,0 +1,14 @@
+"""
+Helpers shared by the resampling tests of the cloud functions
+"""
+
+
+def tail_pvalue(p_less: float, p_greater: float, alternative: str) -> float:
+    """Combine tail probabilities for the requested alternative (two-sided: twice the smaller, capped at 1)"""
+    if alternative == "less":
+        p = p_less
+    elif alternative == "greater":
+        p = p_greater
+    else:
+        p = 2 * min(p_less, p_greater)
+    return float(min(1.0, max(0.0, p)))
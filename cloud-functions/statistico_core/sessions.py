@@ -0,0 +1,117 @@
+"""
+Chunked sessions: running summaries of data sent in several requests
+
+A session keeps, per named stream, the count, mean and M2 (sum of squared
+deviations) merged chunk by chunk, plus a fixed-size reservoir sample for
+the resampling tests run when the session is closed. Sessions live in
+instance memory, so every chunk must reach the same instance (e.g.
+max-instances=1 or session affinity).
+"""
+
+import math
+import threading
+import time
+import uuid
+from typing import Any, Dict, Mapping, Sequence, Tuple
+
+import numpy as np
+
+# Idle lifetime, sessions kept per instance, and reservoir sample sizes
+SESSION_TTL_SECONDS = 900
+MAX_SESSIONS = 1000
+DEFAULT_RESERVOIR_SIZE = 5000
+MAX_RESERVOIR_SIZE = 100_000
+
+_SESSIONS: Dict[str, Dict[str, Any]] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def new_accumulator(reservoir_size: int) -> Dict[str, Any]:
+    """Empty running summary: n, mean, M2 and a reservoir sample"""
+    return {"n": 0, "mean": 0.0, "m2": 0.0, "seen": 0, "reservoir": np.empty(reservoir_size)}
+
+
+def accumulate(acc: Dict[str, Any], values: np.ndarray, rng: np.random.Generator) -> None:
+    """Merge a chunk into the running summary (Chan et al.) and the reservoir (Algorithm R)"""
+    n_chunk = values.size
+    if n_chunk == 0:
+        return
+    mean_chunk = float(values.mean())
+    m2_chunk = float(np.square(values - mean_chunk).sum())
+    n = acc["n"] + n_chunk
+    delta = mean_chunk - acc["mean"]
+    acc["mean"] += delta * n_chunk / n
+    acc["m2"] += m2_chunk + delta * delta * acc["n"] * n_chunk / n
+    acc["n"] = n
+
+    # Vectorized reservoir sampling: the value at stream position t lands in
+    # a random slot with probability k / t
+    reservoir = acc["reservoir"]
+    k, seen = reservoir.size, acc["seen"]
+    fill = max(0, min(k - seen, n_chunk))
+    reservoir[seen:seen + fill] = values[:fill]
+    rest = values[fill:]
+    if k and rest.size:
+        positions = np.arange(seen + fill + 1, seen + n_chunk + 1)
+        slots = rng.integers(0, positions)
+        keep = slots < k
+        reservoir[slots[keep]] = rest[keep]
+    acc["seen"] = seen + n_chunk
+
+
+def accumulator_summary(acc: Dict[str, Any]) -> Dict[str, Any]:
+    n = acc["n"]
+    return {
+        "n": int(n),
+        "mean": float(acc["mean"]) if n else None,
+        "sd": float(math.sqrt(acc["m2"] / (n - 1))) if n > 1 else None,
+        "reservoir_size": int(min(acc["seen"], acc["reservoir"].size)),
+    }
+
+
+def reservoir_sample(acc: Dict[str, Any]) -> np.ndarray:
+    """Filled part of the reservoir"""
+    return acc["reservoir"][:min(acc["seen"], acc["reservoir"].size)]
+
+
+def open_session(
+    function: str, session_id: Any, data: Mapping[str, Any], create: bool, streams: Sequence[str],
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Look up (or, for a first chunk without an id, open) a chunked session
+
+    The session holds one accumulator per name in streams, under
+    session["streams"], sharing one generator seeded from data["seed"]. Only
+    a first chunk (no id yet) opens a session, so chunks sent to an expired
+    session fail instead of silently starting over.
+    """
+    now = time.time()
+    with _SESSIONS_LOCK:
+        for sid in [sid for sid, s in _SESSIONS.items() if now - s["updated"] > SESSION_TTL_SECONDS]:
+            del _SESSIONS[sid]
+        session = _SESSIONS.get(str(session_id)) if session_id else None
+        if session is not None and session["function"] != function:
+            session = None
+        if session is None:
+            if session_id or not create:
+                raise ValueError(f"Unknown or expired session: {session_id}")
+            while len(_SESSIONS) >= MAX_SESSIONS:
+                del _SESSIONS[min(_SESSIONS, key=lambda sid: _SESSIONS[sid]["updated"])]
+            session_id = uuid.uuid4().hex
+            reservoir_size = int(data.get("reservoir_size", DEFAULT_RESERVOIR_SIZE))
+            reservoir_size = max(0, min(MAX_RESERVOIR_SIZE, reservoir_size))
+            session = {
+                "function": function,
+                "streams": {name: new_accumulator(reservoir_size) for name in streams},
+                "rng": np.random.default_rng(int(data.get("seed", 42))),
+                "lock": threading.Lock(),
+                "chunks": 0,
+            }
+            _SESSIONS[session_id] = session
+        session["updated"] = now
+        return str(session_id), session
+
+
+def close_session(session_id: str) -> None:
+    with _SESSIONS_LOCK:
+        _SESSIONS.pop(session_id, None)